@@ -0,0 +1,30 @@
+import cv2
+
+
+def draw_detections(frame, detections):
+    """Draw detection boxes and labels on frame."""
+    for det in detections:
+        bbox = det.get("bbox")
+        if bbox:
+            x1, y1, x2, y2 = bbox
+            
+            # Choose color based on detection type
+            if det["class_name"] == "finished":
+                color = (0, 255, 0)  # Green
+            elif det["class_name"] in ["failure_1", "failure_2"]:
+                color = (0, 0, 255)  # Red
+            else:
+                color = (255, 255, 0)  # Cyan
+            
+            # Draw bounding box
+            cv2.rectangle(frame, (x1, y1), (x2, y2), color, 2)
+            
+            # Draw label with confidence
+            label = f"{det['class_name']}: {det['confidence']:.2f}"
+            label_size, _ = cv2.getTextSize(label, cv2.FONT_HERSHEY_SIMPLEX, 0.6, 2)
+            cv2.rectangle(frame, (x1, y1 - label_size[1] - 10), 
+                         (x1 + label_size[0], y1), color, -1)
+            cv2.putText(frame, label, (x1, y1 - 5), 
+                       cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
+    
+    return frame
@@ -0,0 +1,118 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, List, Optional, Tuple
+
+
+class BatchInferenceWorker:
+    """
+    Shared inference worker for all printer monitors.
+    Frames submitted by monitors are collected for up to max_wait_ms (or
+    until max_batch_size frames, or one frame per active monitor, are
+    waiting) and run through the model as a single batched call. Each
+    caller gets back the result for its own frame.
+    """
+
+    def __init__(self, predict: Callable[[list], list], max_batch_size: int, max_wait_ms: float):
+        self._predict = predict
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max_wait_ms / 1000
+        self._queue: "queue.Queue[Tuple[object, Future]]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._producers = 0
+
+        # Stats
+        self.batches = 0
+        self.frames = 0
+        self.inference_seconds = 0.0
+        self.failed_batches = 0
+        self.failed_frames = 0
+        self.last_error: Optional[str] = None
+
+    def register(self):
+        """Announce a monitor that will submit frames (bounds batch waiting)."""
+        with self._lock:
+            self._producers += 1
+
+    def unregister(self):
+        """Remove a monitor registered with register()."""
+        with self._lock:
+            self._producers = max(0, self._producers - 1)
+
+    def submit(self, frame) -> Future:
+        """Queue a frame for inference. The future resolves to its result."""
+        self._ensure_started()
+        future: Future = Future()
+        self._queue.put((frame, future))
+        return future
+
+    def infer(self, frame, timeout: Optional[float] = None):
+        """Run inference on a frame through the shared batch and wait for it."""
+        return self.submit(frame).result(timeout)
+
+    def stats(self) -> dict:
+        """Batching statistics since startup."""
+        return {
+            "batches": self.batches,
+            "frames": self.frames,
+            "avg_batch_size": self.frames / self.batches if self.batches else 0.0,
+            "avg_ms_per_frame": 1000 * self.inference_seconds / self.frames if self.frames else 0.0,
+            "failed_batches": self.failed_batches,
+            "failed_frames": self.failed_frames,
+            "last_error": self.last_error,
+            "queued": self._queue.qsize(),
+            "active_monitors": self._producers,
+        }
+
+    def _ensure_started(self):
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, daemon=True)
+                    self._thread.start()
+
+    def _collect(self) -> List[Tuple[object, Future]]:
+        batch = [self._queue.get()]
+        # No point waiting for more frames than there are monitors to send them
+        target = min(self.max_batch_size, max(1, self._producers))
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < target:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        # Take anything else that is already waiting, up to the batch size
+        while len(batch) < self.max_batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            frames = [frame for frame, _ in batch]
+            try:
+                start = time.perf_counter()
+                results = self._predict(frames)
+                self.inference_seconds += time.perf_counter() - start
+                self.batches += 1
+                self.frames += len(frames)
+                for (_, future), result in zip(batch, results):
+                    future.set_result(result)
+            except Exception as e:
+                # Every caller gets the error; count and log it once per batch
+                # so a broken model doesn't just look like "no detections"
+                self.failed_batches += 1
+                self.failed_frames += len(frames)
+                self.last_error = str(e)
+                print(f"[AI] Batch of {len(frames)} frame(s) failed: {e}")
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
@@ -0,0 +1,216 @@
+import os
+import threading
+from bisect import bisect_left, bisect_right
+import time
+from typing import BinaryIO, Dict, Optional, Tuple
+
+import numpy as np
+
+from app.ai.postprocess import CLASS_MAP, DETECTION_DTYPE
+from app.core.config import settings
+from app.services.job_service import job_run_key
+
+# One row per detection: DETECTION_DTYPE plus when it was seen (Unix seconds)
+HISTORY_DTYPE = np.dtype([("t", np.float64)] + [(name, DETECTION_DTYPE.fields[name][0]) for name in DETECTION_DTYPE.names])
+
+# Per-class aggregate of the detections in one ROLLUP_S-wide time bin
+ROLLUP_DTYPE = np.dtype([
+    ("t", np.float64),          # bin start
+    ("class_id", np.int16),
+    ("count", np.uint32),
+    ("sum", np.float32),        # sum of confidences
+    ("max", np.float32),
+])
+ROLLUP_S = 10.0
+
+
+def _search(column: np.ndarray, value: float, side: str = "left") -> int:
+    """searchsorted for a strided column: bisects in place instead of copying it."""
+    return (bisect_left if side == "left" else bisect_right)(column, value)
+
+
+class _JobLog:
+    """Open files of an active job and the per-class totals of its current rollup bin."""
+
+    def __init__(self, rows: BinaryIO, rollup: BinaryIO):
+        self.rows = rows
+        self.rollup = rollup
+        self.bin_start: Optional[float] = None
+        self.bin: Dict[int, list] = {}   # class_id -> [count, sum, max]
+
+    def flush_bin(self):
+        if not self.bin:
+            return
+        out = np.empty(len(self.bin), dtype=ROLLUP_DTYPE)
+        for i, (class_id, (count, total, peak)) in enumerate(sorted(self.bin.items())):
+            out[i] = (self.bin_start, class_id, count, total, peak)
+        self.rollup.write(out.tobytes())
+        self.rollup.flush()
+        self.bin = {}
+
+
+class DetectionHistory:
+    """
+    Append-only detection log per job in <directory>: <key>.det holds one
+    fixed-size row per detection, <key>.roll per-class totals per ROLLUP_S
+    bin, where <key> is job_run_key() (a reused job id starts new files).
+    Writers hold two open files and one bin of totals, so memory stays
+    constant however long the print. Queries memory-map the files;
+    coarse series are built from the rollup (a day is ~10k rows) and only
+    fine-grained ranges read the raw rows.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._lock = threading.Lock()
+        self._logs: Dict[str, _JobLog] = {}
+
+    def _path(self, job: dict, ext: str) -> str:
+        return os.path.join(self.directory, f"{job_run_key(job)}.{ext}")
+
+    def append(self, job: dict, detections: np.ndarray, t: Optional[float] = None):
+        """Log a DETECTION_DTYPE array of a job seen at time t (default now)."""
+        if len(detections) == 0:
+            return
+        t = time.time() if t is None else t
+        rows = np.empty(len(detections), dtype=HISTORY_DTYPE)
+        rows["t"] = t
+        for name in DETECTION_DTYPE.names:
+            rows[name] = detections[name]
+
+        bin_start = t - t % ROLLUP_S
+        key = job_run_key(job)
+        with self._lock:
+            log = self._logs.get(key)
+            if log is None:
+                os.makedirs(self.directory, exist_ok=True)
+                log = self._logs[key] = _JobLog(
+                    open(self._path(job, "det"), "ab"), open(self._path(job, "roll"), "ab")
+                )
+            log.rows.write(rows.tobytes())
+            # Queries map the file, so rows must reach it now
+            log.rows.flush()
+
+            if log.bin_start != bin_start:
+                log.flush_bin()
+                log.bin_start = bin_start
+            for class_id, confidence in zip(detections["class_id"].tolist(), detections["confidence"].tolist()):
+                totals = log.bin.setdefault(class_id, [0, 0.0, 0.0])
+                totals[0] += 1
+                totals[1] += confidence
+                totals[2] = max(totals[2], confidence)
+
+    def close(self, job: dict):
+        with self._lock:
+            log = self._logs.pop(job_run_key(job), None)
+            if log is not None:
+                log.flush_bin()
+        if log is not None:
+            log.rows.close()
+            log.rollup.close()
+
+    def _map(self, job: dict, ext: str, dtype: np.dtype) -> np.ndarray:
+        """A job file as a read-only memory map (empty if missing)."""
+        path = self._path(job, ext)
+        try:
+            count = os.path.getsize(path) // dtype.itemsize
+        except OSError:
+            count = 0
+        if count == 0:
+            return np.empty(0, dtype=dtype)
+        return np.memmap(path, dtype=dtype, mode="r", shape=(count,))
+
+    def rows(self, job: dict) -> np.ndarray:
+        """All detection rows of a job (read-only memory map)."""
+        return self._map(job, "det", HISTORY_DTYPE)
+
+    def _columns(self, job: dict, start: Optional[float], end: Optional[float], use_rollup: bool) -> Tuple[np.ndarray, ...]:
+        """(t, class_id, count, sum, max) columns over [start, end] from the rollup or the raw rows."""
+        rows = self.rows(job)
+        if use_rollup:
+            rollup = self._map(job, "roll", ROLLUP_DTYPE)
+            # Detections newer than the last closed bin are only in the raw rows
+            tail_from = float(rollup["t"][-1]) + ROLLUP_S if len(rollup) else float("-inf")
+            rt = rollup["t"]
+            lo = 0 if start is None else _search(rt, start - start % ROLLUP_S, "left")
+            hi = len(rt) if end is None else _search(rt, end, "right")
+            rollup = rollup[lo:hi]
+            raw_from = tail_from if start is None else max(tail_from, start)
+            raw = rows[_search(rows["t"], raw_from, "left"):]
+            if end is not None:
+                raw = raw[:_search(raw["t"], end, "right")]
+            confidence = raw["confidence"].astype(np.float64)
+            return (
+                np.concatenate([rollup["t"], raw["t"]]),
+                np.concatenate([rollup["class_id"], raw["class_id"]]),
+                np.concatenate([rollup["count"].astype(np.int64), np.ones(len(raw), dtype=np.int64)]),
+                np.concatenate([rollup["sum"].astype(np.float64), confidence]),
+                np.concatenate([rollup["max"].astype(np.float64), confidence]),
+            )
+
+        t = rows["t"]
+        # Rows are appended in time order, so a time range is a slice
+        lo = 0 if start is None else _search(t, start, "left")
+        hi = len(t) if end is None else _search(t, end, "right")
+        raw = rows[lo:hi]
+        confidence = raw["confidence"].astype(np.float64)
+        return raw["t"], raw["class_id"], np.ones(len(raw), dtype=np.int64), confidence, confidence
+
+    def summary(
+        self,
+        job: dict,
+        buckets: int = 200,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+    ) -> dict:
+        """
+        Confidence over time, downsampled to at most `buckets` points per
+        class (max and mean confidence and detection count per bucket),
+        plus a histogram of detected classes over [start, end]. Buckets of
+        ROLLUP_S or more are built from the rollup, so range edges are
+        rounded to its bins.
+        """
+        rows = self.rows(job)
+        result = {"job_id": job["id"], "rows": 0, "start": None, "end": None,
+                  "bucket_s": 0.0, "t": [], "classes": {}, "histogram": {}}
+        if len(rows) == 0:
+            return result
+
+        t_first = float(rows["t"][0]) if start is None else max(start, float(rows["t"][0]))
+        t_last = float(rows["t"][-1]) if end is None else min(end, float(rows["t"][-1]))
+        if t_last < t_first:
+            return result
+        width = max((t_last - t_first) / buckets, 1e-6)
+
+        t, class_ids, counts, sums, maxes = self._columns(job, start, end, use_rollup=width >= ROLLUP_S)
+        if len(t) == 0:
+            return result
+
+        bucket = np.clip(((t - t_first) / width).astype(np.int64), 0, buckets - 1)
+        result.update(
+            rows=int(counts.sum()), start=t_first, end=t_last, bucket_s=width,
+            t=(t_first + width * (np.arange(buckets) + 0.5)).tolist(),
+        )
+
+        for class_id in np.unique(class_ids).tolist():
+            name = CLASS_MAP.get(class_id, str(class_id))
+            mask = class_ids == class_id
+            b = bucket[mask]
+            n = np.bincount(b, weights=counts[mask], minlength=buckets)
+            total = np.bincount(b, weights=sums[mask], minlength=buckets)
+            # b is sorted (rows are in time order): max per run of equal buckets
+            starts = np.flatnonzero(np.r_[True, b[1:] != b[:-1]])
+            peak = np.full(buckets, np.nan)
+            peak[b[starts]] = np.maximum.reduceat(maxes[mask], starts)
+
+            result["histogram"][name] = int(n.sum())
+            result["classes"][name] = {
+                "max": [None if c == 0 else round(p, 4) for p, c in zip(peak.tolist(), n.tolist())],
+                "mean": [None if c == 0 else round(s / c, 4) for s, c in zip(total.tolist(), n.tolist())],
+                "count": n.astype(np.int64).tolist(),
+            }
+        return result
+
+
+# Global history written by the AI monitors
+detection_history = DetectionHistory(settings.DETECTION_HISTORY_DIR)
@@ -0,0 +1,78 @@
+import time
+import cv2
+import numpy as np
+from typing import Optional, Tuple
+
+
+class MotionGate:
+    """
+    Cheap change detector placed in front of inference.
+    Each frame is reduced to a small grayscale thumbnail and compared with
+    the thumbnail of the last frame that was actually analyzed. Frames that
+    differ by less than `threshold` (mean absolute gray-level difference)
+    can reuse the previous detections, except that inference is always
+    forced at least every `force_interval_s` seconds.
+    """
+
+    def __init__(self, threshold: float, force_interval_s: float, size: Tuple[int, int] = (64, 48)):
+        self.threshold = threshold
+        self.force_interval_s = force_interval_s
+        self.size = size
+        self._reference: Optional[np.ndarray] = None
+        self._last_analyzed = 0.0
+        self.last_score = 0.0
+
+        # Counters
+        self.analyzed = 0
+        self.skipped = 0
+        self.forced = 0
+
+    def _thumbnail(self, frame: np.ndarray) -> np.ndarray:
+        # Downscale first so the color conversion runs on a few thousand pixels
+        small = cv2.resize(frame, self.size, interpolation=cv2.INTER_AREA)
+        if small.ndim == 3:
+            small = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        return small
+
+    def overdue(self, now: Optional[float] = None) -> bool:
+        """True when the forced-inference floor is due (or nothing was analyzed yet)."""
+        now = time.monotonic() if now is None else now
+        return self._reference is None or now - self._last_analyzed >= self.force_interval_s
+
+    def should_analyze(self, frame: np.ndarray) -> bool:
+        """Return True if the frame changed enough (or long enough ago) to need inference."""
+        thumb = self._thumbnail(frame)
+        now = time.monotonic()
+
+        if self._reference is None:
+            analyze = True
+        elif now - self._last_analyzed >= self.force_interval_s:
+            analyze = True
+            self.forced += 1
+        else:
+            self.last_score = float(cv2.absdiff(thumb, self._reference).mean())
+            analyze = self.last_score >= self.threshold
+
+        if analyze:
+            # Compare against the last analyzed frame, not the previous one,
+            # so slow drift still adds up to a change eventually
+            self._reference = thumb
+            self._last_analyzed = now
+            self.analyzed += 1
+        else:
+            self.skipped += 1
+        return analyze
+
+    @property
+    def skip_ratio(self) -> float:
+        total = self.analyzed + self.skipped
+        return self.skipped / total if total else 0.0
+
+    def stats(self) -> dict:
+        return {
+            "analyzed": self.analyzed,
+            "skipped": self.skipped,
+            "forced": self.forced,
+            "skip_ratio": self.skip_ratio,
+            "last_score": self.last_score,
+        }
@@ -0,0 +1,74 @@
+import numpy as np
+from typing import List
+
+# Class mapping (MUST match training)
+CLASS_MAP = {
+    0: "finished",
+    1: "failure_1",
+    2: "failure_2"
+}
+
+# One row per detection; bbox is [x1, y1, x2, y2] in pixels
+DETECTION_DTYPE = np.dtype([
+    ("class_id", np.int16),
+    ("confidence", np.float32),
+    ("bbox", np.int32, (4,)),
+])
+
+_KNOWN_CLASS_IDS = np.array(sorted(CLASS_MAP), dtype=np.int64)
+FAILURE_CLASS_IDS = np.array(
+    [cls_id for cls_id, name in CLASS_MAP.items() if name.startswith("failure")], dtype=np.int16
+)
+
+
+def empty_detections() -> np.ndarray:
+    return np.empty(0, dtype=DETECTION_DTYPE)
+
+
+def postprocess_result(result, min_confidence: float) -> np.ndarray:
+    """
+    Turn one ultralytics result into a DETECTION_DTYPE array in one pass.
+    The whole box tensor is moved to the host once; thresholding and the
+    class check are NumPy masks instead of per-box tensor conversions.
+    """
+    boxes = result.boxes
+    if boxes is None or len(boxes) == 0:
+        return empty_detections()
+
+    # Columns: x1, y1, x2, y2, [track id,] conf, cls
+    data = boxes.data
+    if hasattr(data, "cpu"):
+        data = data.cpu().numpy()
+    conf = data[:, -2]
+    cls = data[:, -1].astype(np.int64)
+
+    keep = conf >= min_confidence
+    known = np.isin(cls, _KNOWN_CLASS_IDS)
+    unknown = keep & ~known
+    if unknown.any():
+        print(f"[AI] Warning: Unknown class ID(s) {np.unique(cls[unknown]).tolist()} detected")
+    keep &= known
+
+    detections = np.empty(int(keep.sum()), dtype=DETECTION_DTYPE)
+    detections["class_id"] = cls[keep]
+    detections["confidence"] = conf[keep]
+    # astype truncates toward zero, like int() did per coordinate
+    detections["bbox"] = data[keep, :4].astype(np.int32)
+    return detections
+
+
+def detections_to_dicts(detections: np.ndarray) -> List[dict]:
+    """Dict-list view of a detection array (the format analyze_frame returns)."""
+    return [
+        {
+            "class_id": class_id,
+            "class_name": CLASS_MAP[class_id],
+            "confidence": confidence,
+            "bbox": bbox,
+        }
+        for class_id, confidence, bbox in zip(
+            detections["class_id"].tolist(),
+            detections["confidence"].tolist(),
+            detections["bbox"].tolist(),
+        )
+    ]
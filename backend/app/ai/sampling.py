@@ -0,0 +1,137 @@
+import threading
+import time
+from typing import Callable, Dict, Iterable, Optional
+from app.models.monitor import SamplingPolicy
+
+# Per-printer policy overrides; printers without one use the defaults
+_policies: Dict[int, SamplingPolicy] = {}
+_lock = threading.Lock()
+
+# Samplers of running monitors, by job id
+active_samplers: Dict[int, "AdaptiveSampler"] = {}
+
+# Frame counts of monitors that have finished, so savings survive them
+_finished_totals = {"frames": 0, "sampled": 0}
+
+
+def get_policy(printer_id: int) -> SamplingPolicy:
+    """Sampling policy of a printer."""
+    with _lock:
+        return _policies.get(printer_id) or SamplingPolicy()
+
+
+def set_policy(printer_id: int, policy: SamplingPolicy):
+    """Override a printer's sampling policy. Running monitors pick it up on their next frame."""
+    with _lock:
+        _policies[printer_id] = policy
+
+
+def budget_report() -> dict:
+    """Inference budget saved by adaptive sampling, overall and per running job."""
+    samplers = list(active_samplers.items())
+    with _lock:
+        frames = _finished_totals["frames"] + sum(s.frames for _, s in samplers)
+        sampled = _finished_totals["sampled"] + sum(s.sampled for _, s in samplers)
+    return {
+        "frames": frames,
+        "sampled": sampled,
+        "saved_ratio": 1 - sampled / frames if frames else 0.0,
+        "jobs": {job_id: s.stats() for job_id, s in samplers},
+    }
+
+
+class AdaptiveSampler:
+    """
+    Decides which frames of a job get inference.
+    The interval shrinks from max_interval_s at 0% progress to
+    min_interval_s at 100% (quadratically, so most of a long print is
+    sampled sparsely). It drops to min_interval_s for stable_after_s after
+    the set of detected classes changes, and to burst_interval_s for
+    burst_duration_s after a low-confidence failure is seen.
+    """
+
+    def __init__(self, printer_id: int, progress_getter: Callable[[], float], progress_refresh_s: float = 2.0):
+        self.printer_id = printer_id
+        self._progress_getter = progress_getter
+        self._progress_refresh_s = progress_refresh_s
+        self._progress = 0.0
+        self._progress_at = float("-inf")
+
+        self._last_sample = float("-inf")
+        self._last_change = float("-inf")
+        self._burst_until = float("-inf")
+        self._last_classes: frozenset = frozenset()
+
+        # Counters
+        self.frames = 0
+        self.sampled = 0
+        self.bursts = 0
+
+    def _current_progress(self, now: float) -> float:
+        # Progress changes slowly; don't hit the job store on every frame
+        if now - self._progress_at >= self._progress_refresh_s:
+            try:
+                self._progress = float(self._progress_getter() or 0.0)
+            except Exception:
+                pass
+            self._progress_at = now
+        return self._progress
+
+    def interval(self, now: Optional[float] = None) -> float:
+        """Current target time between two inferences."""
+        now = time.monotonic() if now is None else now
+        policy = get_policy(self.printer_id)
+        if not policy.enabled:
+            return 0.0
+        if now < self._burst_until:
+            return policy.burst_interval_s
+        if now - self._last_change < policy.stable_after_s:
+            return policy.min_interval_s
+
+        fraction = min(max(self._current_progress(now) / 100.0, 0.0), 1.0)
+        span = policy.max_interval_s - policy.min_interval_s
+        return policy.max_interval_s - span * fraction ** 2
+
+    def should_sample(self, now: Optional[float] = None, force: bool = False) -> bool:
+        """
+        Count a frame and say whether it is due for inference. force makes
+        it due regardless of the interval (e.g. a refresh floor elsewhere).
+        A due frame may still be skipped by a later stage; only record()
+        counts it as sampled.
+        """
+        now = time.monotonic() if now is None else now
+        self.frames += 1
+        if force or now - self._last_sample >= self.interval(now):
+            self._last_sample = now
+            return True
+        return False
+
+    def record(self, classes: Iterable[str], suspect_failure: bool = False, now: Optional[float] = None):
+        """Feed back the result of an inference (counts the frame as sampled)."""
+        now = time.monotonic() if now is None else now
+        self.sampled += 1
+        classes = frozenset(classes)
+        if classes != self._last_classes:
+            self._last_classes = classes
+            self._last_change = now
+        if suspect_failure:
+            if now >= self._burst_until:
+                self.bursts += 1
+            self._burst_until = now + get_policy(self.printer_id).burst_duration_s
+
+    def close(self):
+        """Fold this sampler's counts into the totals once its monitor ends."""
+        with _lock:
+            _finished_totals["frames"] += self.frames
+            _finished_totals["sampled"] += self.sampled
+
+    def stats(self) -> dict:
+        return {
+            "printer_id": self.printer_id,
+            "frames": self.frames,
+            "sampled": self.sampled,
+            "saved_ratio": 1 - self.sampled / self.frames if self.frames else 0.0,
+            "bursts": self.bursts,
+            "progress": self._progress,
+            "interval_s": self.interval(),
+        }
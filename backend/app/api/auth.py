@@ -1,22 +1,34 @@
 from fastapi import APIRouter, HTTPException, status, Depends
 from fastapi.security import OAuth2PasswordRequestForm
 from app.models.user import UserCreate, UserLogin, User, Token
-from app.services.user_service import create_user, authenticate_user
+from app.services.user_service import create_user_async, authenticate_user_async
+from app.core.config import settings
+from app.core.password_hasher import PasswordHasherBusy
 from app.core.security import create_access_token, get_current_user
 
 router = APIRouter()
 
 
+def _hasher_busy() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Too many sign-in requests, try again shortly",
+        headers={"Retry-After": str(settings.PASSWORD_HASH_RETRY_AFTER_S)},
+    )
+
+
 @router.post("/signup", response_model=User, status_code=status.HTTP_201_CREATED)
-def signup(user_data: UserCreate):
+async def signup(user_data: UserCreate):
     """Register a new user."""
     try:
-        user = create_user(user_data.email, user_data.password)
+        user = await create_user_async(user_data.email, user_data.password)
         return {
             "id": user["id"],
             "email": user["email"],
             "created_at": user["created_at"]
         }
+    except PasswordHasherBusy:
+        raise _hasher_busy()
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -25,9 +37,12 @@ def signup(user_data: UserCreate):
 
 
 @router.post("/signin", response_model=Token)
-def signin(form_data: OAuth2PasswordRequestForm = Depends()):
+async def signin(form_data: OAuth2PasswordRequestForm = Depends()):
     """Login and get access token."""
-    user = authenticate_user(form_data.username, form_data.password)
+    try:
+        user = await authenticate_user_async(form_data.username, form_data.password)
+    except PasswordHasherBusy:
+        raise _hasher_busy()
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -35,14 +50,17 @@ def signin(form_data: OAuth2PasswordRequestForm = Depends()):
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    access_token = create_access_token(data={"sub": user["id"]})
+    access_token = create_access_token(data={"sub": str(user["id"])})
     return {"access_token": access_token, "token_type": "bearer"}
 
 
 @router.post("/signin-json", response_model=Token)
-def signin_json(credentials: UserLogin):
+async def signin_json(credentials: UserLogin):
     """Login with JSON body (alternative to form data)."""
-    user = authenticate_user(credentials.email, credentials.password)
+    try:
+        user = await authenticate_user_async(credentials.email, credentials.password)
+    except PasswordHasherBusy:
+        raise _hasher_busy()
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -50,7 +68,7 @@ def signin_json(credentials: UserLogin):
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    access_token = create_access_token(data={"sub": user["id"]})
+    access_token = create_access_token(data={"sub": str(user["id"])})
     return {"access_token": access_token, "token_type": "bearer"}
 
 
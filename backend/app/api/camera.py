@@ -1,61 +1,115 @@
-import cv2
-import io
-from fastapi import APIRouter
-from fastapi.responses import StreamingResponse
-from app.services.camera_service import camera_service
+import asyncio
+import anyio
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import Response, StreamingResponse
+from app.services.camera_service import camera_registry, CameraService
 
 router = APIRouter()
 
 
-def generate_frames():
-    """Generator function to yield camera frames as JPEG."""
-    while True:
-        frame = camera_service.get_latest_frame()
-        if frame is None:
-            # Try to read a new frame
-            frame = camera_service.read_frame()
-        
-        if frame is not None:
-            # Encode frame as JPEG
-            ret, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, 85])
-            if ret:
-                frame_bytes = buffer.tobytes()
+async def generate_frames(request: Request, camera: CameraService):
+    """Async generator yielding camera frames as JPEG."""
+    # Frames are encoded once by the camera's broadcaster and shared by
+    # every client. The broadcaster wakes us through the event loop, so an
+    # idle client costs no thread and we only send new frames.
+    broadcaster = camera.broadcaster
+    loop = asyncio.get_running_loop()
+    new_frame = asyncio.Event()
+
+    def notify():
+        loop.call_soon_threadsafe(new_frame.set)
+
+    broadcaster.subscribe(notify)
+    try:
+        seq = 0
+        while True:
+            try:
+                await asyncio.wait_for(new_frame.wait(), timeout=5.0)
+            except asyncio.TimeoutError:
+                # No frames for a while: make sure the client is still there
+                if await request.is_disconnected():
+                    break
+                continue
+            new_frame.clear()
+
+            seq, frame_bytes = broadcaster.latest(seq)
+            if frame_bytes is not None:
                 yield (b'--frame\r\n'
                        b'Content-Type: image/jpeg\r\n\r\n' + frame_bytes + b'\r\n')
-        else:
-            # If no frame available, yield a placeholder or wait
-            import time
-            time.sleep(0.1)
+    finally:
+        # Runs on disconnect too: the response cancels the generator
+        broadcaster.unsubscribe(notify)
+
+
+class CameraStreamResponse(StreamingResponse):
+    """
+    MJPEG response holding a camera reference, released when the response
+    ends however it ends; the body's own cleanup never runs if the body
+    was never iterated (client gone before the first chunk).
+    """
+
+    def __init__(self, request: Request, camera: CameraService, printer_id: Optional[int]):
+        super().__init__(generate_frames(request, camera), media_type="multipart/x-mixed-replace; boundary=frame")
+        self.printer_id = printer_id
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            # Shielded: a cancelled stream would otherwise cancel the release too
+            with anyio.CancelScope(shield=True):
+                await run_in_threadpool(camera_registry.release, self.printer_id)
+
+
+async def _stream(request: Request, printer_id: Optional[int]):
+    if await run_in_threadpool(camera_registry.source_for, printer_id) is None:
+        raise HTTPException(status_code=404, detail="Printer not found")
+
+    # Opening the device blocks, keep it off the event loop. The reference
+    # keeps the camera open while this client watches.
+    camera = await run_in_threadpool(camera_registry.acquire, printer_id)
+    if camera is None:
+        raise HTTPException(status_code=503, detail="Camera not available")
+
+    return CameraStreamResponse(request, camera, printer_id)
+
+
+def _frame(printer_id: Optional[int]):
+    camera = camera_registry.get(printer_id)
+    if camera is None:
+        raise HTTPException(status_code=404, detail="Printer not found")
+
+    if camera.current_frame is None:
+        raise HTTPException(status_code=503, detail="Camera not available")
+
+    frame_bytes = camera.broadcaster.snapshot()
+    if frame_bytes is None:
+        raise HTTPException(status_code=500, detail="Failed to encode frame")
+
+    return Response(content=frame_bytes, media_type="image/jpeg")
 
 
 @router.get("/stream")
-def stream_camera():
-    """MJPEG stream endpoint for live camera feed."""
-    # Ensure camera is started
-    if not camera_service.is_available():
-        camera_service.start_camera()
-    
-    return StreamingResponse(
-        generate_frames(),
-        media_type="multipart/x-mixed-replace; boundary=frame"
-    )
+async def stream_camera(request: Request):
+    """MJPEG stream endpoint for live camera feed (default camera)."""
+    return await _stream(request, None)
 
 
 @router.get("/frame")
 def get_single_frame():
-    """Get a single frame as JPEG (fallback endpoint)."""
-    frame = camera_service.get_latest_frame()
-    if frame is None:
-        frame = camera_service.read_frame()
-    
-    if frame is None:
-        from fastapi import HTTPException
-        raise HTTPException(status_code=503, detail="Camera not available")
-    
-    ret, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, 85])
-    if not ret:
-        from fastapi import HTTPException
-        raise HTTPException(status_code=500, detail="Failed to encode frame")
-    
-    from fastapi.responses import Response
-    return Response(content=buffer.tobytes(), media_type="image/jpeg")
+    """Get a single frame as JPEG (fallback endpoint, default camera)."""
+    return _frame(None)
+
+
+@router.get("/{printer_id}/stream")
+async def stream_printer_camera(printer_id: int, request: Request):
+    """MJPEG stream of a printer's camera."""
+    return await _stream(request, printer_id)
+
+
+@router.get("/{printer_id}/frame")
+def get_printer_frame(printer_id: int):
+    """Single JPEG frame from a printer's camera."""
+    return _frame(printer_id)
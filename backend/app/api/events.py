@@ -0,0 +1,56 @@
+import asyncio
+from typing import List, Optional
+from fastapi import APIRouter, Query, Request
+from fastapi.responses import StreamingResponse
+from app.core.config import settings
+from app.events.push_hub import push_hub
+
+router = APIRouter()
+
+
+async def generate_events(request: Request, printer_ids: Optional[List[int]], job_ids: Optional[List[int]]):
+    """Async generator yielding server-sent events for one client."""
+    # Like camera streams: the hub wakes us through the event loop, so an
+    # idle client costs no thread
+    loop = asyncio.get_running_loop()
+    pending = asyncio.Event()
+
+    def notify():
+        loop.call_soon_threadsafe(pending.set)
+
+    client = push_hub.connect(notify, printer_ids=printer_ids, job_ids=job_ids)
+    try:
+        yield "retry: 3000\n\n"
+        while True:
+            try:
+                await asyncio.wait_for(pending.wait(), timeout=settings.PUSH_HEARTBEAT_S)
+            except asyncio.TimeoutError:
+                if await request.is_disconnected():
+                    break
+                # Comment line: keeps proxies from closing an idle stream
+                yield ": ping\n\n"
+                continue
+            pending.clear()
+
+            messages = client.drain()
+            if messages:
+                yield "".join(messages)
+    finally:
+        push_hub.disconnect(client)
+
+
+@router.get("/stream")
+async def event_stream(
+    request: Request,
+    printer_id: Optional[List[int]] = Query(None),
+    job_id: Optional[List[int]] = Query(None),
+):
+    """
+    Server-sent event stream of job/printer events and throttled progress.
+    Repeat printer_id / job_id to only receive events of those printers or jobs.
+    """
+    return StreamingResponse(
+        generate_events(request, printer_id, job_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
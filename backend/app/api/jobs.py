@@ -1,10 +1,42 @@
-from fastapi import APIRouter, HTTPException
-from app.models.job import PrintJobCreate, PrintJob
-from app.services.job_service import create_job, update_progress, fail_job, list_jobs, get_job
+import asyncio
+import base64
+from datetime import datetime, timezone
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Query, Request
+from app.ai.detection_history import detection_history
+from app.api.snapshot import SnapshotCache, snapshot_response
+from app.core.config import settings
+from app.models.job import PrintJobCreate, PrintJob, ProgressBatch, ProgressBatchResult
+from app.services.job_service import (
+    create_job, update_progress, fail_job, find_job_ids, get_jobs, get_job, jobs_version, progress_coalescer
+)
 from app.services.printer_service import get_printer
 
 router = APIRouter()
 
+# Serialized /list pages, reused until the job store changes
+list_snapshot = SnapshotCache(PrintJob, jobs_version)
+
+
+def _encode_cursor(after_id: int) -> str:
+    return base64.urlsafe_b64encode(f"j{after_id}".encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> int:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        if not raw.startswith("j"):
+            raise ValueError(cursor)
+        return int(raw[1:])
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def _naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Job timestamps are naive UTC; convert timezone-aware query values to match."""
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
 @router.post("/create", response_model=PrintJob)
 def api_create_job(job: PrintJobCreate):
     # Validate printer exists
@@ -18,8 +50,65 @@ def api_create_job(job: PrintJobCreate):
     return create_job(
         printer_id=job.printer_id,
         file_name=job.file_name,
-        user_email=job.user_email
+        user_email=job.user_email,
+        priority=job.priority
+    )
+
+# Declared before /{job_id} so "list" isn't taken for a job id
+@router.get("/list", response_model=list[PrintJob])
+def api_list_jobs(
+    request: Request,
+    printer_id: Optional[int] = None,
+    status: Optional[str] = None,
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(settings.JOBS_PAGE_DEFAULT_LIMIT, ge=1, le=settings.JOBS_PAGE_MAX_LIMIT),
+):
+    """
+    One page of jobs (oldest first) matching the filters. When more jobs
+    match, the X-Next-Cursor header holds the cursor of the next page.
+    """
+    after_id = _decode_cursor(cursor) if cursor else 0
+    created_after, created_before = _naive_utc(created_after), _naive_utc(created_before)
+    # The index lookup is cheap; records are only fetched and serialized on a cache miss.
+    # The version is read first, so a page built from a stale lookup is never
+    # cached under a version that already includes the change
+    version = jobs_version()
+    job_ids, next_after = find_job_ids(
+        printer_id=printer_id,
+        status=status,
+        created_after=created_after,
+        created_before=created_before,
+        after_id=after_id,
+        limit=limit,
+    )
+    key = (printer_id, status, created_after, created_before, after_id, limit)
+    etag, body = list_snapshot.get(lambda: get_jobs(job_ids), key=key, version=version)
+    headers = {"X-Next-Cursor": _encode_cursor(next_after)} if next_after is not None else None
+    return snapshot_response(request, etag, body, headers=headers)
+
+@router.post("/progress", response_model=ProgressBatchResult)
+async def api_update_progress_batch(batch: ProgressBatch):
+    """
+    Report progress for many jobs at once. Updates from concurrent calls
+    within PROGRESS_COALESCE_WINDOW_MS are merged and applied together.
+    """
+    if len(batch.updates) > settings.PROGRESS_BATCH_MAX_UPDATES:
+        raise HTTPException(
+            status_code=413,
+            detail=f"At most {settings.PROGRESS_BATCH_MAX_UPDATES} updates per call"
+        )
+
+    job_ids = {u.job_id for u in batch.updates}
+    result = await asyncio.wrap_future(
+        progress_coalescer.submit((u.job_id, u.progress) for u in batch.updates)
     )
+    return {
+        "updated": sum(job_id in result["updated"] for job_id in job_ids),
+        "finished": [job_id for job_id in result["finished"] if job_id in job_ids],
+        "not_found": [job_id for job_id in result["not_found"] if job_id in job_ids],
+    }
 
 @router.get("/{job_id}", response_model=PrintJob)
 def api_get_job(job_id: int):
@@ -28,6 +117,22 @@ def api_get_job(job_id: int):
         raise HTTPException(status_code=404, detail="Job not found")
     return job
 
+@router.get("/{job_id}/detections")
+def api_job_detections(
+    job_id: int,
+    buckets: int = Query(200, ge=1, le=5000),
+    start: Optional[float] = None,
+    end: Optional[float] = None,
+):
+    """
+    Detection history of a job: per-class confidence over time downsampled
+    to `buckets` points, and a class histogram. start/end are Unix seconds.
+    """
+    job = get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return detection_history.summary(job, buckets=buckets, start=start, end=end)
+
 @router.post("/{job_id}/progress", response_model=PrintJob)
 def api_update_progress(job_id: int, progress: float):
     updated = update_progress(job_id, progress)
@@ -41,7 +146,3 @@ def api_fail_job(job_id: int):
     if not failed:
         raise HTTPException(status_code=404, detail="Job not found")
     return failed
-
-@router.get("/list", response_model=list[PrintJob])
-def api_list_jobs():
-    return list_jobs()
@@ -0,0 +1,37 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from app.core.metrics import metrics
+from app.events.event_manager import event_manager
+from app.events.monitor_scheduler import monitor_scheduler
+from app.events.push_hub import push_hub
+from app.services.camera_service import camera_registry
+
+router = APIRouter()
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _monitors():
+    snapshot = monitor_scheduler.snapshot()
+    return {("active",): len(snapshot["active"]), ("queued",): len(snapshot["queued"])}
+
+
+def _stream_clients():
+    return {(source,): clients for source, clients in camera_registry.stream_clients().items()}
+
+
+def _event_queue_depths():
+    return {(str(worker),): depth for worker, depth in enumerate(event_manager.stats()["queue_depths"])}
+
+
+# Read when scraped, from the services that own the values
+metrics.gauge("smart3d_monitors", "AI monitors by state", ("state",), collect=_monitors)
+metrics.gauge("smart3d_stream_clients", "MJPEG stream clients per camera", ("camera",), collect=_stream_clients)
+metrics.gauge("smart3d_push_clients", "Server-sent event clients", collect=lambda: {(): push_hub.stats()["clients"]})
+metrics.gauge("smart3d_event_queue_depth", "Undelivered events per dispatch worker", ("worker",), collect=_event_queue_depths)
+
+
+@router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+def prometheus_metrics():
+    """All metrics in the Prometheus text exposition format."""
+    return PlainTextResponse(metrics.render(), media_type=PROMETHEUS_CONTENT_TYPE)
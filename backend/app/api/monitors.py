@@ -0,0 +1,43 @@
+from fastapi import APIRouter, HTTPException
+from app.ai.sampling import budget_report, get_policy, set_policy
+from app.events.monitor_scheduler import monitor_scheduler
+from app.models.monitor import SamplingPolicy
+from app.services.printer_service import get_printer
+
+router = APIRouter()
+
+
+@router.get("/list")
+def api_list_monitors():
+    """Running and queued AI monitors."""
+    return monitor_scheduler.snapshot()
+
+
+@router.delete("/{job_id}")
+def api_cancel_monitor(job_id: int):
+    """Stop a running monitor or remove a queued one."""
+    if not monitor_scheduler.cancel(job_id):
+        raise HTTPException(status_code=404, detail="No monitor for this job")
+    return {"job_id": job_id, "cancelled": True}
+
+
+@router.get("/sampling")
+def api_sampling_report():
+    """Inference budget saved by adaptive sampling, overall and per running job."""
+    return budget_report()
+
+
+@router.get("/sampling/{printer_id}", response_model=SamplingPolicy)
+def api_get_sampling_policy(printer_id: int):
+    if not get_printer(printer_id):
+        raise HTTPException(status_code=404, detail="Printer not found")
+    return get_policy(printer_id)
+
+
+@router.put("/sampling/{printer_id}", response_model=SamplingPolicy)
+def api_set_sampling_policy(printer_id: int, policy: SamplingPolicy):
+    """Set a printer's sampling policy; running monitors apply it immediately."""
+    if not get_printer(printer_id):
+        raise HTTPException(status_code=404, detail="Printer not found")
+    set_policy(printer_id, policy)
+    return policy
@@ -1,19 +1,25 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
+from app.api.snapshot import SnapshotCache, snapshot_response
 from app.models.printer import PrinterCreate, Printer
-from app.services.printer_service import register_printer, list_printers, get_printer
+from app.services.printer_service import register_printer, list_printers, get_printer, printers_version
 
 router = APIRouter()
 
+# Serialized /list body, reused until the printer store changes
+list_snapshot = SnapshotCache(Printer, printers_version)
+
 @router.post("/register", response_model=Printer)
 def register(printer: PrinterCreate):
     return register_printer(
         name=printer.name,
-        location=printer.location
+        location=printer.location,
+        camera_source=printer.camera_source
     )
 
 @router.get("/list", response_model=list[Printer])
-def api_list_printers():
-    return list_printers()
+def api_list_printers(request: Request):
+    etag, body = list_snapshot.get(list_printers)
+    return snapshot_response(request, etag, body)
 
 @router.get("/{printer_id}", response_model=Printer)
 def api_get_printer(printer_id: int):
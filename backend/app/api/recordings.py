@@ -0,0 +1,25 @@
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import FileResponse
+from app.services.job_service import get_job
+from app.services.recorder import recorder
+
+router = APIRouter()
+
+
+@router.get("/{job_id}")
+def api_list_recordings(job_id: int):
+    """Time-lapse and incident clips recorded for a job."""
+    job = get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return recorder.list_recordings(job)
+
+
+@router.get("/{job_id}/{name}")
+def api_get_recording(job_id: int, name: str):
+    """Download one recording of a job."""
+    job = get_job(job_id)
+    path = recorder.recording_path(job, name) if job else None
+    if path is None:
+        raise HTTPException(status_code=404, detail="Recording not found")
+    return FileResponse(path, media_type="video/mp4", filename=name)
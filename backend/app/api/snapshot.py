@@ -0,0 +1,88 @@
+import secrets
+import threading
+import zlib
+from collections import OrderedDict
+from typing import Callable, Hashable, List, Optional, Tuple, Type
+from fastapi import Request, Response
+from pydantic import BaseModel, TypeAdapter
+
+# Changes on every start, so ETags from a previous process never match
+_BOOT_ID = secrets.token_hex(4)
+
+
+class SnapshotCache:
+    """
+    Pre-serialized JSON list responses, rebuilt only when the data changes.
+    version() is the backing store's write counter; every cached body is
+    dropped as soon as it moves. Bodies are keyed by the query (e.g. list
+    filters), keeping at most max_keys of them per version. Versions only
+    grow; a body built against an older version than the cache's is
+    served but not cached.
+    """
+
+    def __init__(self, model: Type[BaseModel], version: Callable[[], int], max_keys: int = 64):
+        self._adapter = TypeAdapter(List[model])
+        self._version_of = version
+        self.max_keys = max_keys
+        self._lock = threading.Lock()
+        self._version = None
+        self._entries: "OrderedDict[Hashable, Tuple[str, bytes]]" = OrderedDict()
+
+        # Stats
+        self.hits = 0
+        self.builds = 0
+
+    def get(self, build: Callable[[], list], key: Hashable = None, version: Optional[int] = None) -> Tuple[str, bytes]:
+        """
+        (etag, JSON body) for the records build() returns, from cache when
+        unchanged. Pass version when build() depends on data read before
+        this call (e.g. an index lookup): read it before that data.
+        """
+        if version is None:
+            version = self._version_of()
+        with self._lock:
+            if self._version is None or version > self._version:
+                self._entries.clear()
+                self._version = version
+            entry = self._entries.get(key) if version == self._version else None
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+
+        # Built outside the lock. A write racing with this build makes the
+        # version move on, so the entry is at worst rebuilt once more.
+        # Validated then dumped, exactly like response_model would
+        body = self._adapter.dump_json(self._adapter.validate_python(build()))
+        etag = f'"{_BOOT_ID}-{version}-{zlib.crc32(body):08x}"'
+        with self._lock:
+            self.builds += 1
+            if self._version == version:
+                self._entries[key] = (etag, body)
+                while len(self._entries) > self.max_keys:
+                    self._entries.popitem(last=False)
+        return etag, body
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.builds
+        return {
+            "version": self._version,
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "builds": self.builds,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in tags or etag in tags or f"W/{etag}" in tags
+
+
+def snapshot_response(request: Request, etag: str, body: bytes, headers: dict = None) -> Response:
+    """JSON response for a snapshot, or 304 when the client already has it."""
+    headers = {"ETag": etag, "Cache-Control": "no-cache", **(headers or {})}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
@@ -0,0 +1,87 @@
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+from app.events.ai_monitor import detector_stats
+from app.events.event_manager import event_manager
+from app.events.push_hub import push_hub
+from app.services.recorder import recorder
+from app.core.config import settings
+from app.core.password_hasher import password_hasher
+from app.core.profiler import ProfilerBusy, profiler
+from app.core.token_cache import token_cache
+from app.api.jobs import list_snapshot as jobs_snapshot
+from app.api.printers import list_snapshot as printers_snapshot
+from app.services.job_service import progress_coalescer
+
+router = APIRouter()
+
+
+@router.get("/events")
+def api_event_stats():
+    """Event dispatch statistics (delivery latency, queue depths, drops)."""
+    return event_manager.stats()
+
+
+@router.get("/inference")
+def api_inference_stats():
+    """Inference backend, latency per backend and batching statistics."""
+    return detector_stats()
+
+
+@router.get("/auth-cache")
+def api_auth_cache_stats():
+    """Verified-token cache statistics (size, hit rate, evictions)."""
+    return token_cache.stats()
+
+
+@router.get("/password-hashing")
+def api_password_hashing_stats():
+    """Password hashing pool statistics (in flight, rejected)."""
+    return password_hasher.stats()
+
+
+@router.get("/progress-ingest")
+def api_progress_ingest_stats():
+    """Bulk progress ingestion statistics (updates received, coalesced, batches applied)."""
+    return progress_coalescer.stats()
+
+
+@router.get("/push")
+def api_push_stats():
+    """Push stream statistics (clients, messages published, drops)."""
+    return push_hub.stats()
+
+
+@router.get("/list-cache")
+def api_list_cache_stats():
+    """Snapshot cache statistics of the list endpoints."""
+    return {"jobs": jobs_snapshot.stats(), "printers": printers_snapshot.stats()}
+
+
+@router.get("/recorder")
+def api_recorder_stats():
+    """Recorder statistics (samples, drops, incidents per job)."""
+    return recorder.stats()
+
+
+@router.get("/profile")
+def api_profile(
+    seconds: float = Query(10.0, gt=0),
+    interval_ms: float = Query(settings.PROFILER_INTERVAL_MS, ge=1, le=1000),
+    top: int = Query(30, ge=1, le=500),
+    include_idle: bool = False,
+    format: str = Query("json", pattern="^(json|collapsed)$"),
+):
+    """
+    Sample all threads' stacks for `seconds` (at most PROFILER_MAX_SECONDS)
+    and return the hottest functions. format=collapsed returns the stacks
+    in the collapsed format for flamegraph.pl or speedscope.
+    """
+    if not settings.PROFILER_ENABLED:
+        raise HTTPException(status_code=404, detail="Profiler is disabled")
+    try:
+        result = profiler.profile(seconds, interval_ms / 1000, top=top, include_idle=include_idle)
+    except ProfilerBusy:
+        raise HTTPException(status_code=409, detail="A profile is already running")
+    if format == "collapsed":
+        return PlainTextResponse(result["collapsed"] + "\n")
+    return result
@@ -10,8 +10,102 @@ class Settings:
     MODEL_PATH: str = os.getenv("MODEL_PATH", "app/ai/models/my_model.pt")
     CONFIDENCE_THRESHOLD: float = float(os.getenv("CONFIDENCE_THRESHOLD", "0.6"))
     
+    # Inference backend: torch, or a CPU-optimized export of the same weights (onnx / openvino)
+    INFERENCE_BACKEND: str = os.getenv("INFERENCE_BACKEND", "torch")
+    INFERENCE_IMGSZ: int = int(os.getenv("INFERENCE_IMGSZ", "640"))
+    MODEL_WARMUP: bool = os.getenv("MODEL_WARMUP", "True").lower() == "true"
+    
+    # Batched inference shared by all monitors
+    INFERENCE_BATCHING: bool = os.getenv("INFERENCE_BATCHING", "True").lower() == "true"
+    INFERENCE_MAX_BATCH_SIZE: int = int(os.getenv("INFERENCE_MAX_BATCH_SIZE", "8"))
+    INFERENCE_MAX_WAIT_MS: float = float(os.getenv("INFERENCE_MAX_WAIT_MS", "20"))
+    
+    # Adaptive sampling: inference interval driven by job progress
+    ADAPTIVE_SAMPLING: bool = os.getenv("ADAPTIVE_SAMPLING", "True").lower() == "true"
+    SAMPLING_MIN_INTERVAL_S: float = float(os.getenv("SAMPLING_MIN_INTERVAL_S", "0.5"))
+    SAMPLING_MAX_INTERVAL_S: float = float(os.getenv("SAMPLING_MAX_INTERVAL_S", "10.0"))
+    SAMPLING_BURST_INTERVAL_S: float = float(os.getenv("SAMPLING_BURST_INTERVAL_S", "0.0"))
+    SAMPLING_BURST_DURATION_S: float = float(os.getenv("SAMPLING_BURST_DURATION_S", "10.0"))
+    SAMPLING_STABLE_AFTER_S: float = float(os.getenv("SAMPLING_STABLE_AFTER_S", "30.0"))
+    # Failures above this (but below CONFIDENCE_THRESHOLD) trigger a sampling burst
+    SUSPECT_CONFIDENCE_THRESHOLD: float = float(os.getenv("SUSPECT_CONFIDENCE_THRESHOLD", "0.3"))
+    
+    # Monitor scheduling
+    MAX_CONCURRENT_MONITORS: int = int(os.getenv("MAX_CONCURRENT_MONITORS", "4"))
+    MONITOR_QUEUE_SIZE: int = int(os.getenv("MONITOR_QUEUE_SIZE", "100"))
+    
+    # Motion gating: skip inference on frames that barely changed
+    MOTION_GATING: bool = os.getenv("MOTION_GATING", "True").lower() == "true"
+    MOTION_THRESHOLD: float = float(os.getenv("MOTION_THRESHOLD", "3.0"))
+    FORCE_INFERENCE_INTERVAL_S: float = float(os.getenv("FORCE_INFERENCE_INTERVAL_S", "5.0"))
+    
     # Camera Configuration
     CAMERA_INDEX: int = int(os.getenv("CAMERA_INDEX", "0"))
+    # Overrides CAMERA_INDEX, e.g. synthetic://640x480@30 to run without a webcam
+    CAMERA_SOURCE: str = os.getenv("CAMERA_SOURCE", "")
+    CAMERA_RING_SLOTS: int = int(os.getenv("CAMERA_RING_SLOTS", "8"))
+    STREAM_MAX_FPS: float = float(os.getenv("STREAM_MAX_FPS", "15"))
+    STREAM_JPEG_QUALITY: int = int(os.getenv("STREAM_JPEG_QUALITY", "85"))
+    
+    # Job listing pages
+    JOBS_PAGE_DEFAULT_LIMIT: int = int(os.getenv("JOBS_PAGE_DEFAULT_LIMIT", "100"))
+    JOBS_PAGE_MAX_LIMIT: int = int(os.getenv("JOBS_PAGE_MAX_LIMIT", "1000"))
+    
+    # Bulk progress ingestion: updates arriving within this window are applied together
+    PROGRESS_COALESCE_WINDOW_MS: float = float(os.getenv("PROGRESS_COALESCE_WINDOW_MS", "50"))
+    PROGRESS_BATCH_MAX_UPDATES: int = int(os.getenv("PROGRESS_BATCH_MAX_UPDATES", "10000"))
+    
+    # Recording: job time-lapses and failure clips, encoded in a separate process
+    RECORDING_ENABLED: bool = os.getenv("RECORDING_ENABLED", "True").lower() == "true"
+    RECORDINGS_DIR: str = os.getenv("RECORDINGS_DIR", "./recordings")
+    RECORD_TIMELAPSE_INTERVAL_S: float = float(os.getenv("RECORD_TIMELAPSE_INTERVAL_S", "10"))
+    RECORD_TIMELAPSE_FPS: float = float(os.getenv("RECORD_TIMELAPSE_FPS", "24"))
+    RECORD_CLIP_FPS: float = float(os.getenv("RECORD_CLIP_FPS", "5"))
+    RECORD_PRE_TRIGGER_S: float = float(os.getenv("RECORD_PRE_TRIGGER_S", "10"))
+    RECORD_POST_TRIGGER_S: float = float(os.getenv("RECORD_POST_TRIGGER_S", "10"))
+    RECORD_SHM_SLOTS: int = int(os.getenv("RECORD_SHM_SLOTS", "8"))
+    RECORD_MAX_BYTES: int = int(os.getenv("RECORD_MAX_BYTES", str(2 * 1024 ** 3)))
+    RECORD_MAX_AGE_H: float = float(os.getenv("RECORD_MAX_AGE_H", "168"))
+    # How often the limits are enforced while jobs are recording (also after each clip)
+    RECORD_EVICT_INTERVAL_S: float = float(os.getenv("RECORD_EVICT_INTERVAL_S", "30"))
+    
+    # Per-job detection history (append-only files, memory-mapped for queries)
+    DETECTION_HISTORY_ENABLED: bool = os.getenv("DETECTION_HISTORY_ENABLED", "True").lower() == "true"
+    DETECTION_HISTORY_DIR: str = os.getenv("DETECTION_HISTORY_DIR", "./detections")
+    
+    # Event dispatch
+    EVENT_DISPATCH_MODE: str = os.getenv("EVENT_DISPATCH_MODE", "async")  # async / sync
+    EVENT_WORKERS: int = int(os.getenv("EVENT_WORKERS", "4"))
+    EVENT_QUEUE_SIZE: int = int(os.getenv("EVENT_QUEUE_SIZE", "1000"))
+    EVENT_QUEUE_TIMEOUT_S: float = float(os.getenv("EVENT_QUEUE_TIMEOUT_S", "0.5"))
+    
+    # Verified-token cache for authenticated requests
+    TOKEN_CACHE_SIZE: int = int(os.getenv("TOKEN_CACHE_SIZE", "1024"))
+    TOKEN_CACHE_TTL_S: float = float(os.getenv("TOKEN_CACHE_TTL_S", "300"))
+    
+    # Password hashing: bcrypt cost and the process pool it runs on
+    BCRYPT_ROUNDS: int = int(os.getenv("BCRYPT_ROUNDS", "12"))
+    PASSWORD_HASH_WORKERS: int = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))  # 0 = thread pool
+    PASSWORD_HASH_QUEUE_SIZE: int = int(os.getenv("PASSWORD_HASH_QUEUE_SIZE", "16"))
+    PASSWORD_HASH_RETRY_AFTER_S: int = int(os.getenv("PASSWORD_HASH_RETRY_AFTER_S", "1"))
+    
+    # Push updates (server-sent events) to dashboards
+    PUSH_CLIENT_QUEUE_SIZE: int = int(os.getenv("PUSH_CLIENT_QUEUE_SIZE", "256"))
+    PUSH_PROGRESS_INTERVAL_S: float = float(os.getenv("PUSH_PROGRESS_INTERVAL_S", "1.0"))
+    PUSH_HEARTBEAT_S: float = float(os.getenv("PUSH_HEARTBEAT_S", "15"))
+    
+    # Metrics (Prometheus text format on /metrics) and the on-demand sampling profiler
+    METRICS_ENABLED: bool = os.getenv("METRICS_ENABLED", "True").lower() == "true"
+    PROFILER_ENABLED: bool = os.getenv("PROFILER_ENABLED", "True").lower() == "true"
+    PROFILER_MAX_SECONDS: float = float(os.getenv("PROFILER_MAX_SECONDS", "60"))
+    PROFILER_INTERVAL_MS: float = float(os.getenv("PROFILER_INTERVAL_MS", "10"))
+    
+    # Storage Configuration
+    STORAGE_BACKEND: str = os.getenv("STORAGE_BACKEND", "memory")  # memory / sql
+    DATABASE_URL: str = os.getenv("DATABASE_URL", "sqlite:///./smart3d.db")
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "5"))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+    DB_COMMIT_INTERVAL_MS: int = int(os.getenv("DB_COMMIT_INTERVAL_MS", "250"))
     
     @classmethod
     def get_model_path(cls) -> Path:
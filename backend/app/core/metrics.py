@@ -0,0 +1,260 @@
+import bisect
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+# Latency buckets (seconds), from sub-millisecond frame work to slow requests
+DEFAULT_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Iterable[str], values: Iterable[str]) -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict) -> LabelValues:
+        return tuple(str(labels[name]) for name in self.labels)
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"] + self._samples()
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Gauge(_Metric):
+    """
+    Current value per label set. Either set() by the code that owns the
+    value, or read at scrape time from `collect`, which returns
+    {label values tuple: value}.
+    """
+    kind = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labels: Tuple[str, ...] = (),
+        collect: Optional[Callable[[], Dict[LabelValues, float]]] = None,
+    ):
+        super().__init__(name, help, labels)
+        self._values: Dict[LabelValues, float] = {}
+        self.collect = collect
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def _samples(self) -> List[str]:
+        if self.collect is not None:
+            try:
+                values = list(self.collect().items())
+            except Exception as e:
+                print(f"[Metrics] Collecting {self.name} failed: {e}")
+                values = []
+        else:
+            with self._lock:
+                values = list(self._values.items())
+        return [
+            f"{self.name}{_format_labels(self.labels, tuple(map(str, k)))} {_format_value(v)}"
+            for k, v in values
+        ]
+
+
+class Histogram(_Metric):
+    """Bucketed observations per label set (cumulative buckets, sum and count)."""
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...] = (), buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [count per bucket (+Inf last), sum]
+        self._values: Dict[LabelValues, list] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            entry[0][index] += 1
+            entry[1] += value
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            values = [(k, list(counts), total) for k, (counts, total) in self._values.items()]
+        lines = []
+        bounds = [_format_value(b) for b in self.buckets] + ["+Inf"]
+        for key, counts, total in values:
+            cumulative = 0
+            for bound, count in zip(bounds, counts):
+                cumulative += count
+                labels = _format_labels(self.labels + ("le",), key + (bound,))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labels, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class RateMeter:
+    """
+    Events per second per label set, over windows of `window_s` seconds
+    (the running rate until the first window completes). Exposed as a
+    gauge; a label set with no events for two windows reads 0.
+    """
+
+    def __init__(self, window_s: float = 5.0):
+        self.window_s = window_s
+        self._lock = threading.Lock()
+        # label values -> [window start, events in window, last rate]
+        self._windows: Dict[LabelValues, list] = {}
+
+    def mark(self, *labels):
+        key = tuple(str(v) for v in labels)
+        now = time.monotonic()
+        with self._lock:
+            window = self._windows.get(key)
+            if window is None:
+                self._windows[key] = [now, 1, 0.0]
+                return
+            window[1] += 1
+            elapsed = now - window[0]
+            if elapsed >= self.window_s:
+                window[:] = [now, 0, window[1] / elapsed]
+
+    def rates(self) -> Dict[LabelValues, float]:
+        now = time.monotonic()
+        with self._lock:
+            windows = [(key, list(window)) for key, window in self._windows.items()]
+        rates = {}
+        for key, (start, count, rate) in windows:
+            elapsed = now - start
+            if elapsed >= 2 * self.window_s:
+                rates[key] = 0.0
+            elif rate == 0.0 and elapsed > 0:
+                rates[key] = count / elapsed
+            else:
+                rates[key] = rate
+        return rates
+
+
+class Registry:
+    """Metrics rendered together in the Prometheus text format."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric {metric.name} already registered")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def gauge(self, name: str, help: str, labels: Tuple[str, ...] = (), collect=None) -> Gauge:
+        return self.register(Gauge(name, help, labels, collect))
+
+    def histogram(self, name: str, help: str, labels: Tuple[str, ...] = (), buckets=DEFAULT_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, help, labels, buckets))
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware timing HTTP requests by route template (e.g.
+    /api/jobs/{job_id}), so ids don't explode the label set. Requests that
+    match no route are counted under "unmatched". Streaming responses are
+    timed until the stream ends.
+    """
+
+    def __init__(self, app, histogram: Histogram):
+        self.app = app
+        self.histogram = histogram
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            self.histogram.observe(
+                time.perf_counter() - start,
+                method=scope["method"],
+                route=getattr(route, "path", "unmatched"),
+                status=status["code"],
+            )
+
+
+# Global registry behind /metrics, and the pipeline metrics recorded across the app
+metrics = Registry()
+
+CAMERA_STAGE_SECONDS = metrics.histogram(
+    "smart3d_camera_stage_seconds",
+    "Per-camera frame stages: read (capture device, including the wait for a frame), annotate and encode (stream JPEG)",
+    ("camera", "stage"),
+)
+MONITOR_STAGE_SECONDS = metrics.histogram(
+    "smart3d_monitor_stage_seconds",
+    "Per-printer AI monitor stages: inference, postprocess, and frame (whole loop iteration)",
+    ("printer_id", "stage"),
+)
+EVENT_DISPATCH_SECONDS = metrics.histogram(
+    "smart3d_event_dispatch_seconds",
+    "Time from emit to the end of a subscriber call, per event",
+    ("event",),
+)
+HTTP_REQUEST_SECONDS = metrics.histogram(
+    "smart3d_http_request_seconds",
+    "HTTP request duration per route template",
+    ("method", "route", "status"),
+)
+
+camera_fps = RateMeter()
+monitor_fps = RateMeter()
+metrics.gauge("smart3d_camera_fps", "Frames captured per second", ("camera",), collect=camera_fps.rates)
+metrics.gauge("smart3d_monitor_fps", "Frames processed per second by the AI monitor", ("printer_id",), collect=monitor_fps.rates)
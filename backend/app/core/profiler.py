@@ -0,0 +1,137 @@
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, Tuple
+from app.core.config import settings
+
+
+class ProfilerBusy(Exception):
+    """Raised when a profile is requested while another one is running."""
+
+
+def _frame_key(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({code.co_filename}:{code.co_firstlineno})"
+
+
+class SamplingProfiler:
+    """
+    On-demand wall-clock sampling profiler for the running process.
+    The calling thread snapshots every other thread's stack via
+    sys._current_frames() at a fixed interval; nothing is instrumented and
+    the process pays nothing while no profile is running. Only one profile
+    runs at a time. Stacks are aggregated into the "collapsed" format
+    (flamegraph.pl / speedscope) and top functions by self and total time.
+    """
+
+    def __init__(self, max_seconds: float, max_stack_depth: int = 64):
+        self.max_seconds = max_seconds
+        self.max_stack_depth = max_stack_depth
+        self._running = threading.Lock()
+        self.profiles = 0
+
+    def profile(self, seconds: float, interval_s: float, top: int = 30, include_idle: bool = False) -> dict:
+        """
+        Sample for `seconds` (capped at max_seconds) and return the profile.
+        Threads parked in a Python-level wait (a lock, a queue, a socket)
+        are left out unless include_idle, so the result leans towards where
+        CPU time goes; blocking C calls still count.
+        """
+        if not self._running.acquire(blocking=False):
+            raise ProfilerBusy()
+        try:
+            return self._profile(min(seconds, self.max_seconds), interval_s, top, include_idle)
+        finally:
+            self._running.release()
+
+    def _profile(self, seconds: float, interval_s: float, top: int, include_idle: bool) -> dict:
+        me = threading.get_ident()
+        names = {t.ident: t.name for t in threading.enumerate()}
+        stacks: Counter = Counter()
+        per_thread: Counter = Counter()
+        samples = 0
+
+        started = time.perf_counter()
+        deadline = started + seconds
+        while time.perf_counter() < deadline:
+            for ident, frame in sys._current_frames().items():
+                if ident == me:
+                    continue
+                if not include_idle and _is_idle(frame):
+                    continue
+                stack = self._stack(frame)
+                if ident not in names:
+                    names = {t.ident: t.name for t in threading.enumerate()}
+                thread = names.get(ident, str(ident))
+                stacks[(thread,) + stack] += 1
+                per_thread[thread] += 1
+            samples += 1
+            time.sleep(interval_s)
+        elapsed = time.perf_counter() - started
+        self.profiles += 1
+
+        self_counts: Counter = Counter()
+        total_counts: Counter = Counter()
+        for stack, count in stacks.items():
+            functions = stack[1:]
+            if functions:
+                self_counts[functions[-1]] += count
+            for function in set(functions):
+                total_counts[function] += count
+
+        thread_samples = sum(per_thread.values())
+        return {
+            "duration_s": round(elapsed, 3),
+            "interval_ms": interval_s * 1000,
+            "samples": samples,
+            "thread_samples": thread_samples,
+            "threads": dict(per_thread.most_common()),
+            "top_self": _top(self_counts, thread_samples, top),
+            "top_total": _top(total_counts, thread_samples, top),
+            "collapsed": _collapsed(stacks),
+        }
+
+    def _stack(self, frame) -> Tuple[str, ...]:
+        """Function names from the outermost frame in, truncated to max_stack_depth innermost frames."""
+        frames: List[str] = []
+        while frame is not None and len(frames) < self.max_stack_depth:
+            frames.append(_frame_key(frame))
+            frame = frame.f_back
+        return tuple(reversed(frames))
+
+    def stats(self) -> dict:
+        return {
+            "running": self._running.locked(),
+            "profiles": self.profiles,
+            "max_seconds": self.max_seconds,
+        }
+
+
+# Modules whose frames, when innermost, mean the thread is parked in a wait.
+# Blocking C calls (time.sleep, cap.read) have no frame of their own and
+# show up as their Python caller.
+_IDLE_MODULES = (
+    "threading.py", "queue.py", "selectors.py", "socket.py", "concurrent/futures/thread.py",
+    "multiprocessing/connection.py",
+)
+
+
+def _is_idle(frame) -> bool:
+    return frame.f_code.co_filename.endswith(_IDLE_MODULES)
+
+
+def _top(counts: Counter, total: int, n: int) -> List[Dict[str, object]]:
+    return [
+        {"function": function, "samples": count, "percent": round(100 * count / total, 2) if total else 0.0}
+        for function, count in counts.most_common(n)
+    ]
+
+
+def _collapsed(stacks: Counter) -> str:
+    """One line per distinct stack: "thread;outer;...;inner count"."""
+    return "\n".join(f"{';'.join(stack)} {count}" for stack, count in stacks.most_common())
+
+
+# Global profiler behind /api/system/profile
+profiler = SamplingProfiler(settings.PROFILER_MAX_SECONDS)
@@ -4,6 +4,7 @@ from jose import JWTError, jwt
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from app.services.user_service import get_user_by_id
+from app.core.token_cache import token_cache
 
 # Secret key for JWT (in production, use environment variable)
 SECRET_KEY = "your-secret-key-change-in-production"
@@ -36,23 +37,38 @@ def verify_token(token: str) -> Optional[dict]:
 
 
 async def get_current_user(token: str = Depends(oauth2_scheme)):
-    """Dependency to get current authenticated user."""
+    """
+    Dependency to get current authenticated user.
+    Tokens seen before come from the verified-token cache, skipping the
+    signature check and the user lookup.
+    """
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
     
+    user = token_cache.get(token)
+    if user is not None:
+        # Handlers get their own copy; the cached user stays intact
+        return dict(user)
+    
     payload = verify_token(token)
     if payload is None:
         raise credentials_exception
     
-    user_id: int = payload.get("sub")
-    if user_id is None:
+    # JWT subjects are strings; user ids are ints
+    try:
+        user_id = int(payload.get("sub"))
+    except (TypeError, ValueError):
         raise credentials_exception
     
+    # Taken before the load: if the user is changed meanwhile, the
+    # (possibly stale) user we read isn't cached
+    generation = token_cache.generation(user_id)
     user = get_user_by_id(user_id)
     if user is None:
         raise credentials_exception
     
-    return user
+    token_cache.put(token, user, exp=payload.get("exp"), generation=generation)
+    return dict(user)
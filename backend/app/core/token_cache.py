@@ -0,0 +1,112 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Set, Tuple
+from app.core.config import settings
+
+
+class TokenCache:
+    """
+    Bounded LRU cache of verified access token -> user.
+    An entry lives until the token's own exp or for ttl_s, whichever comes
+    first, so a cached token is never accepted after it expires. Entries of
+    a user are dropped with invalidate_user() whenever that user changes.
+    A lookup racing with an invalidation passes the user's generation()
+    from before it loaded the user; put() ignores it if the user has been
+    invalidated since.
+    """
+
+    def __init__(self, max_size: int, ttl_s: float):
+        self.max_size = max(0, max_size)
+        self.ttl_s = ttl_s
+        self._lock = threading.Lock()
+        # token -> (expires_at wall-clock seconds, user)
+        self._entries: "OrderedDict[str, Tuple[float, dict]]" = OrderedDict()
+        self._tokens_of: Dict[int, Set[str]] = {}
+        # user id -> times invalidated
+        self._generations: Dict[int, int] = {}
+
+        # Stats
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, token: str) -> Optional[dict]:
+        """Cached user for a token, or None on a miss or an expired entry."""
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is not None:
+                if entry[0] > time.time():
+                    self._entries.move_to_end(token)
+                    self.hits += 1
+                    return entry[1]
+                self._remove(token)
+            self.misses += 1
+            return None
+
+    def generation(self, user_id: int) -> int:
+        """Invalidation counter of a user; read it before loading the user to cache."""
+        with self._lock:
+            return self._generations.get(user_id, 0)
+
+    def put(self, token: str, user: dict, exp: Optional[float] = None, generation: Optional[int] = None):
+        """
+        Cache a verified token. exp is the token's exp claim (seconds since
+        epoch); generation is the user's generation() from before the user
+        was loaded, and a stale one means the user changed meanwhile.
+        """
+        if self.max_size == 0:
+            return
+        expires_at = time.time() + self.ttl_s
+        if exp is not None:
+            expires_at = min(expires_at, float(exp))
+        with self._lock:
+            if generation is not None and generation != self._generations.get(user["id"], 0):
+                return
+            if token in self._entries:
+                self._remove(token)
+            self._entries[token] = (expires_at, user)
+            self._tokens_of.setdefault(user["id"], set()).add(token)
+            while len(self._entries) > self.max_size:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def invalidate_user(self, user_id: int):
+        """Drop every cached token of a user (call when the user changes)."""
+        with self._lock:
+            self._generations[user_id] = self._generations.get(user_id, 0) + 1
+            for token in self._tokens_of.pop(user_id, ()):
+                self._entries.pop(token, None)
+                self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._tokens_of.clear()
+
+    def _remove(self, token: str):
+        """Drop one entry. Caller holds the lock."""
+        _, user = self._entries.pop(token)
+        tokens = self._tokens_of.get(user["id"])
+        if tokens is not None:
+            tokens.discard(token)
+            if not tokens:
+                del self._tokens_of[user["id"]]
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl_s": self.ttl_s,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+
+# Global cache used by get_current_user
+token_cache = TokenCache(settings.TOKEN_CACHE_SIZE, settings.TOKEN_CACHE_TTL_S)
@@ -1,96 +1,177 @@
 import cv2
+import threading
+import time
+import numpy as np
+from pathlib import Path
+from typing import Optional
 from ultralytics import YOLO
 from app.events.event_manager import event_manager
 from app.core.config import settings
-from app.services.camera_service import camera_service
+from app.core.metrics import MONITOR_STAGE_SECONDS, monitor_fps
+from app.services.camera_service import camera_registry
+from app.ai.batch_inference import BatchInferenceWorker
+from app.ai.detection_history import detection_history
+from app.ai.motion_gate import MotionGate
+from app.ai.sampling import AdaptiveSampler, active_samplers
+from app.services.job_service import get_job
+from app.services.recorder import recorder
+from app.ai.postprocess import (
+    FAILURE_CLASS_IDS, detections_to_dicts, empty_detections, postprocess_result,
+)
 
-# Class mapping (MUST match training)
-CLASS_MAP = {
-    0: "finished",
-    1: "failure_1",
-    2: "failure_2"
+# Lazy-loaded model (None until first use, or until warm-up at startup)
+_model = None
+_model_lock = threading.Lock()
+
+# Export formats of the optimized CPU backends, and the suffix ultralytics
+# gives the exported weights
+EXPORT_BACKENDS = {
+    "onnx": ".onnx",
+    "openvino": "_openvino_model",
 }
 
-# Lazy-loaded model (None until first use)
-_model = None
+# Inference latency per backend: calls, frames, total and max seconds
+_latency = {}
+_latency_lock = threading.Lock()
+
+
+def _exported_model_path(model_path: Path, backend: str) -> Path:
+    """Export the weights for an optimized backend once and reuse the export."""
+    # The export is specific to the input size and, with batching, must take
+    # multi-frame batches: a dynamic batch axis, and for OpenVINO also the
+    # max batch size (ultralytics only runs it in batch mode when batch > 1)
+    dynamic = settings.INFERENCE_BATCHING
+    batch = settings.INFERENCE_MAX_BATCH_SIZE if dynamic and backend == "openvino" else 1
+    stem = f"{model_path.stem}_{settings.INFERENCE_IMGSZ}{'_dynamic' if dynamic else ''}{f'_b{batch}' if batch > 1 else ''}"
+    target = model_path.with_name(stem + EXPORT_BACKENDS[backend])
+    if not target.exists():
+        print(f"[AI] Exporting {model_path} to {backend} (imgsz={settings.INFERENCE_IMGSZ}, batch={batch})")
+        exported = YOLO(str(model_path)).export(
+            format=backend, imgsz=settings.INFERENCE_IMGSZ, dynamic=dynamic, batch=batch
+        )
+        Path(exported).rename(target)
+    return target
 
 
 def get_model():
     """Lazy load model on first use."""
     global _model
     if _model is None:
-        model_path = settings.get_model_path()
-        if not settings.model_exists():
-            raise FileNotFoundError(
-                f"Model file not found at {model_path}. "
-                f"Please ensure the model file exists or set MODEL_PATH environment variable."
-            )
-        try:
-            _model = YOLO(str(model_path))
-            print(f"[AI] Model loaded from {model_path}")
-        except Exception as e:
-            raise RuntimeError(f"Failed to load YOLO model: {str(e)}")
+        with _model_lock:
+            if _model is None:
+                model_path = settings.get_model_path()
+                if not settings.model_exists():
+                    raise FileNotFoundError(
+                        f"Model file not found at {model_path}. "
+                        f"Please ensure the model file exists or set MODEL_PATH environment variable."
+                    )
+                backend = settings.INFERENCE_BACKEND
+                try:
+                    if backend in EXPORT_BACKENDS:
+                        weights = _exported_model_path(model_path, backend)
+                        _model = YOLO(str(weights), task="detect")
+                    else:
+                        weights = model_path
+                        _model = YOLO(str(weights))
+                    print(f"[AI] Model loaded from {weights} ({backend} backend)")
+                except Exception as e:
+                    raise RuntimeError(f"Failed to load YOLO model: {str(e)}")
     return _model
 
 
-def analyze_frame(frame):
-    """Analyze a frame using YOLO model."""
+def predict(frames):
+    """Run the model on a frame or a list of frames, recording latency per backend."""
+    model = get_model()
+    start = time.perf_counter()
+    results = model(frames, imgsz=settings.INFERENCE_IMGSZ, verbose=False)
+    elapsed = time.perf_counter() - start
+
+    # Monitor threads call this concurrently when batching is off
+    with _latency_lock:
+        stats = _latency.setdefault(
+            settings.INFERENCE_BACKEND, {"calls": 0, "frames": 0, "total_s": 0.0, "max_s": 0.0}
+        )
+        stats["calls"] += 1
+        stats["frames"] += len(frames) if isinstance(frames, list) else 1
+        stats["total_s"] += elapsed
+        stats["max_s"] = max(stats["max_s"], elapsed)
+    return results
+
+
+def detector_stats() -> dict:
+    """Inference latency per backend, plus batching statistics."""
+    with _latency_lock:
+        latency = {backend: dict(s) for backend, s in _latency.items()}
+    return {
+        "backend": settings.INFERENCE_BACKEND,
+        "imgsz": settings.INFERENCE_IMGSZ,
+        "loaded": _model is not None,
+        "latency": {
+            backend: {
+                "calls": s["calls"],
+                "frames": s["frames"],
+                "avg_ms_per_call": 1000 * s["total_s"] / s["calls"],
+                "avg_ms_per_frame": 1000 * s["total_s"] / s["frames"],
+                "max_ms": 1000 * s["max_s"],
+            }
+            for backend, s in latency.items()
+        },
+        "batching": inference_worker.stats(),
+    }
+
+
+def warmup_model():
+    """Load the model and run a few dummy inferences so the first job doesn't pay for it."""
     try:
-        model = get_model()
-        results = model(frame, verbose=False)
-        detections = []
-
-        for r in results:
-            for box in r.boxes:
-                cls_id = int(box.cls[0])
-                conf = float(box.conf[0])
-
-                if conf >= settings.CONFIDENCE_THRESHOLD:
-                    if cls_id in CLASS_MAP:
-                        # Get bounding box coordinates
-                        x1, y1, x2, y2 = box.xyxy[0].cpu().numpy()
-                        detections.append({
-                            "class_id": cls_id,
-                            "class_name": CLASS_MAP[cls_id],
-                            "confidence": conf,
-                            "bbox": [int(x1), int(y1), int(x2), int(y2)]
-                        })
-                    else:
-                        print(f"[AI] Warning: Unknown class ID {cls_id} detected")
+        start = time.perf_counter()
+        get_model()
+        dummy = np.zeros((settings.INFERENCE_IMGSZ, settings.INFERENCE_IMGSZ, 3), dtype=np.uint8)
+        for _ in range(2):
+            predict([dummy])
+        print(f"[AI] Model warmed up in {time.perf_counter() - start:.1f}s")
+    except Exception as e:
+        print(f"[AI] Model warm-up skipped: {str(e)}")
+
 
-        return detections
+# Shared worker batching frames from all active monitors into one model call
+inference_worker = BatchInferenceWorker(
+    predict,
+    max_batch_size=settings.INFERENCE_MAX_BATCH_SIZE,
+    max_wait_ms=settings.INFERENCE_MAX_WAIT_MS,
+)
+
+
+def analyze_frame_array(frame, min_confidence: Optional[float] = None, printer_id: Optional[int] = None) -> np.ndarray:
+    """
+    Analyze a frame using YOLO model, returning a DETECTION_DTYPE array.
+    Keeps detections at or above min_confidence (default CONFIDENCE_THRESHOLD).
+    With a printer_id, stage timings go to that printer's metrics.
+    """
+    if min_confidence is None:
+        min_confidence = settings.CONFIDENCE_THRESHOLD
+    try:
+        start = time.perf_counter()
+        if settings.INFERENCE_BATCHING:
+            results = [inference_worker.infer(frame)]
+        else:
+            results = predict(frame)
+        inferred = time.perf_counter()
+
+        arrays = [postprocess_result(r, min_confidence) for r in results]
+        if printer_id is not None:
+            MONITOR_STAGE_SECONDS.observe(inferred - start, printer_id=printer_id, stage="inference")
+            MONITOR_STAGE_SECONDS.observe(time.perf_counter() - inferred, printer_id=printer_id, stage="postprocess")
+        if len(arrays) == 1:
+            return arrays[0]
+        return np.concatenate(arrays) if arrays else empty_detections()
     except Exception as e:
         print(f"[AI] Error analyzing frame: {str(e)}")
-        return []
+        return empty_detections()
 
 
-def draw_detections(frame, detections):
-    """Draw detection boxes and labels on frame."""
-    for det in detections:
-        bbox = det.get("bbox")
-        if bbox:
-            x1, y1, x2, y2 = bbox
-            
-            # Choose color based on detection type
-            if det["class_name"] == "finished":
-                color = (0, 255, 0)  # Green
-            elif det["class_name"] in ["failure_1", "failure_2"]:
-                color = (0, 0, 255)  # Red
-            else:
-                color = (255, 255, 0)  # Cyan
-            
-            # Draw bounding box
-            cv2.rectangle(frame, (x1, y1), (x2, y2), color, 2)
-            
-            # Draw label with confidence
-            label = f"{det['class_name']}: {det['confidence']:.2f}"
-            label_size, _ = cv2.getTextSize(label, cv2.FONT_HERSHEY_SIMPLEX, 0.6, 2)
-            cv2.rectangle(frame, (x1, y1 - label_size[1] - 10), 
-                         (x1 + label_size[0], y1), color, -1)
-            cv2.putText(frame, label, (x1, y1 - 5), 
-                       cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
-    
-    return frame
+def analyze_frame(frame, min_confidence: Optional[float] = None):
+    """Analyze a frame using YOLO model (list of detection dicts)."""
+    return detections_to_dicts(analyze_frame_array(frame, min_confidence))
 
 
 def check_camera_available(camera_index: int) -> bool:
@@ -106,13 +187,17 @@ def check_camera_available(camera_index: int) -> bool:
     return ret
 
 
-def monitor_printer(job):
-    """Monitor printer using AI vision. Handles errors gracefully."""
-    camera_index = settings.CAMERA_INDEX
+def monitor_printer(job, stop_event: Optional[threading.Event] = None):
+    """
+    Monitor printer using AI vision. Handles errors gracefully.
+    Returns early, without emitting anything, once stop_event is set.
+    """
+    printer_id = job["printer_id"]
     
-    # Start camera service
-    if not camera_service.start_camera(camera_index):
-        error_msg = f"Camera {camera_index} is not available"
+    # Take a reference to this printer's camera (shared with its other users)
+    camera = camera_registry.acquire(printer_id)
+    if camera is None:
+        error_msg = f"Camera {camera_registry.source_for(printer_id)} for printer {printer_id} is not available"
         print(f"[AI] ERROR: {error_msg}")
         event_manager.emit("job_monitoring_failed", job=job, error=error_msg)
         return
@@ -123,19 +208,33 @@ def monitor_printer(job):
     except (FileNotFoundError, RuntimeError) as e:
         error_msg = str(e)
         print(f"[AI] ERROR: {error_msg}")
-        camera_service.stop_camera()
+        camera_registry.release(printer_id)
         event_manager.emit("job_monitoring_failed", job=job, error=error_msg)
         return
     
-    print(f"[AI] Monitoring job {job['id']} with camera {camera_index}")
+    print(f"[AI] Monitoring job {job['id']} with camera {camera.camera_index}")
+    inference_worker.register()
     
     frame_count = 0
     consecutive_failures = 0
     max_consecutive_failures = 10
+    detections = []
+    gate = None
+    if settings.MOTION_GATING:
+        gate = MotionGate(settings.MOTION_THRESHOLD, settings.FORCE_INFERENCE_INTERVAL_S)
+    
+    # Progress-driven inference rate (policy is per printer)
+    sampler = AdaptiveSampler(printer_id, lambda: (get_job(job["id"]) or job).get("progress", 0.0))
+    active_samplers[job["id"]] = sampler
+
+    # Time-lapse and failure clips; sampled on the recorder's own thread
+    recorder.start(job, camera)
+
+    last_seq = 0
 
     try:
-        while True:
-            frame = camera_service.read_frame()
+        while stop_event is None or not stop_event.is_set():
+            seq, frame = camera.wait_for_raw_frame(last_seq, timeout=1.0)
             if frame is None:
                 consecutive_failures += 1
                 if consecutive_failures >= max_consecutive_failures:
@@ -147,33 +246,58 @@ def monitor_printer(job):
             
             consecutive_failures = 0
             frame_count += 1
+            last_seq = seq
             
-            # Analyze frame
-            detections = analyze_frame(frame)
-            
-            # Draw detections on frame for streaming
-            frame_with_detections = draw_detections(frame.copy(), detections)
-            
-            # Update camera service with annotated frame
-            camera_service.update_frame(frame_with_detections)
+            # Keep the ring slot from being reused while the frame is processed
+            with camera.pinned_frame(seq) as frame:
+                if frame is None:
+                    # Lapped by the capture thread; just take the next frame
+                    continue
+                frame_start = time.perf_counter()
+                
+                # Analyze frame when the sampling policy says it is due and it
+                # changed enough; otherwise reuse the previous detections. The
+                # motion gate's forced-inference floor overrides the sampler,
+                # so no frame goes unanalyzed for longer than FORCE_INFERENCE_INTERVAL_S
+                due = sampler.should_sample(force=gate is not None and gate.overdue())
+                if due and (gate is None or gate.should_analyze(frame)):
+                    # Also fetch low-confidence boxes: a suspected failure
+                    # makes the sampler burst so it is confirmed quickly
+                    candidates = analyze_frame_array(
+                        frame, min_confidence=settings.SUSPECT_CONFIDENCE_THRESHOLD, printer_id=printer_id
+                    )
+                    confident = candidates["confidence"] >= settings.CONFIDENCE_THRESHOLD
+                    suspect = bool(np.any(~confident & np.isin(candidates["class_id"], FAILURE_CLASS_IDS)))
+                    detections = detections_to_dicts(candidates[confident])
+                    if settings.DETECTION_HISTORY_ENABLED:
+                        detection_history.append(job, candidates)
+                    sampler.record([d["class_name"] for d in detections], suspect_failure=suspect)
+                
+                    # Viewers draw these lazily on the frames they encode
+                    camera.publish_detections(detections, owner=job["id"])
+
+                MONITOR_STAGE_SECONDS.observe(time.perf_counter() - frame_start, printer_id=printer_id, stage="frame")
+                monitor_fps.mark(printer_id)
             
             # Process detections
             for d in detections:
                 if d["class_name"] == "finished":
                     print(f"[AI] Print finished detected (confidence: {d['confidence']:.2f})")
                     event_manager.emit("job_finished", job=job)
-                    camera_service.stop_camera()
                     return
 
                 if d["class_name"] in ["failure_1", "failure_2"]:
                     print(f"[AI] Failure detected: {d['class_name']} (confidence: {d['confidence']:.2f})")
+                    recorder.trigger(job["id"], d["class_name"])
                     event_manager.emit("job_failed", job=job)
-                    camera_service.stop_camera()
                     return
             
             # Log progress every 100 frames
             if frame_count % 100 == 0:
-                print(f"[AI] Processed {frame_count} frames for job {job['id']}")
+                skipped = f" ({gate.skip_ratio:.0%} skipped by motion gate)" if gate else ""
+                print(f"[AI] Processed {frame_count} frames for job {job['id']}{skipped}")
+        else:
+            print(f"[AI] Monitoring stopped for job {job['id']}")
     
     except KeyboardInterrupt:
         print(f"[AI] Monitoring interrupted for job {job['id']}")
@@ -182,5 +306,15 @@ def monitor_printer(job):
         print(f"[AI] ERROR: {error_msg}")
         event_manager.emit("job_monitoring_failed", job=job, error=error_msg)
     finally:
-        camera_service.stop_camera()
+        if gate is not None:
+            print(f"[AI] Motion gate for job {job['id']}: {gate.stats()}")
+        detection_history.close(job)
+        active_samplers.pop(job["id"], None)
+        sampler.close()
+        print(f"[AI] Adaptive sampling for job {job['id']}: {sampler.stats()}")
+        inference_worker.unregister()
+        # Keeps going until a failure clip has its post-trigger frames
+        recorder.stop(job["id"])
+        camera.publish_detections(None, owner=job["id"])
+        camera_registry.release(printer_id)
         print(f"[AI] Camera released for job {job['id']}")
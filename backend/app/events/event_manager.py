@@ -1,26 +1,178 @@
-from typing import Callable, Dict, List
+import queue
+import threading
+import time
+from typing import Callable, Dict, Hashable, List, Optional, Tuple
+from app.core.config import settings
+from app.core.metrics import EVENT_DISPATCH_SECONDS
+
+
+class _Delivery:
+    """One pending call of a subscriber."""
+    __slots__ = ("event_name", "callback", "kwargs", "enqueued_at", "coalesce_key")
+
+    def __init__(self, event_name: str, callback: Callable, kwargs: dict, coalesce_key=None):
+        self.event_name = event_name
+        self.callback = callback
+        self.kwargs = kwargs
+        self.enqueued_at = time.perf_counter()
+        self.coalesce_key = coalesce_key
+
 
 class EventManager:
     """
     Simple publish/subscribe event manager.
     Other modules can subscribe to events like 'job_finished' or 'job_failed'.
+
+    In "async" mode (EVENT_DISPATCH_MODE) emit() only enqueues: a pool of
+    EVENT_WORKERS threads delivers events, each subscriber always on the
+    same worker so it sees events in emit order. Queues are bounded; a
+    full queue blocks the emitter for up to EVENT_QUEUE_TIMEOUT_S and then
+    drops the delivery. In "sync" mode subscribers run inline as before.
+    Either way a failing subscriber is logged and never reaches the emitter.
     """
 
-    def __init__(self):
+    def __init__(
+        self,
+        mode: Optional[str] = None,
+        workers: Optional[int] = None,
+        queue_size: Optional[int] = None,
+    ):
         # dictionary of event_name -> list of callback functions
         self._subscribers: Dict[str, List[Callable]] = {}
+        self.mode = mode or settings.EVENT_DISPATCH_MODE
+        self.workers = max(1, workers or settings.EVENT_WORKERS)
+        self.queue_size = queue_size or settings.EVENT_QUEUE_SIZE
+
+        self._lock = threading.Lock()
+        self._queues: List["queue.Queue[_Delivery]"] = []
+        self._worker_of: Dict[Callable, int] = {}
+        self._worker_of_key: Dict[Hashable, int] = {}
+        # (event_name, callback, coalesce_key) -> delivery still in a queue
+        self._pending: Dict[Tuple[str, Callable, Hashable], _Delivery] = {}
+
+        # Stats
+        self._stats: Dict[str, Dict[str, float]] = {}
+        self.dropped = 0
+        self.coalesced = 0
+        self.errors = 0
+
+    def subscribe(self, event_name: str, callback: Callable, worker_key: Optional[Hashable] = None):
+        """
+        Subscribe a callback to an event.
+        Callbacks sharing a worker_key run on the same worker, so they see
+        each other's events in emit order too.
+        """
+        with self._lock:
+            if event_name not in self._subscribers:
+                self._subscribers[event_name] = []
+            self._subscribers[event_name].append(callback)
+            if callback not in self._worker_of:
+                key = callback if worker_key is None else worker_key
+                if key not in self._worker_of_key:
+                    # Round-robin: spreads subscribers, pins each to one worker
+                    self._worker_of_key[key] = len(self._worker_of_key) % self.workers
+                self._worker_of[callback] = self._worker_of_key[key]
+
+    def emit(self, event_name: str, coalesce_key: Optional[Hashable] = None, **kwargs):
+        """
+        Emit an event to all subscribers.
+        With a coalesce_key, an undelivered earlier emit of the same event
+        and key is updated in place (latest kwargs win) instead of queueing
+        a duplicate. Only applies in async mode.
+        """
+        callbacks = self._subscribers.get(event_name)
+        if not callbacks:
+            return
+
+        if self.mode != "async":
+            for callback in list(callbacks):
+                self._deliver(_Delivery(event_name, callback, kwargs))
+            return
+
+        self._ensure_workers()
+        for callback in list(callbacks):
+            if coalesce_key is not None:
+                key = (event_name, callback, coalesce_key)
+                with self._lock:
+                    pending = self._pending.get(key)
+                    if pending is not None:
+                        pending.kwargs = kwargs
+                        self.coalesced += 1
+                        continue
+                    delivery = self._pending[key] = _Delivery(event_name, callback, kwargs, coalesce_key)
+            else:
+                delivery = _Delivery(event_name, callback, kwargs)
+
+            try:
+                self._queues[self._worker_of[callback]].put(delivery, timeout=settings.EVENT_QUEUE_TIMEOUT_S)
+            except queue.Full:
+                with self._lock:
+                    self.dropped += 1
+                    if coalesce_key is not None:
+                        self._pending.pop((event_name, callback, coalesce_key), None)
+                print(f"[EVENT] Queue full, dropped {event_name} for {getattr(callback, '__name__', callback)}")
+
+    def _ensure_workers(self):
+        if self._queues:
+            return
+        with self._lock:
+            if self._queues:
+                return
+            queues = [queue.Queue(maxsize=self.queue_size) for _ in range(self.workers)]
+            for i, q in enumerate(queues):
+                threading.Thread(target=self._worker, args=(q,), name=f"event-worker-{i}", daemon=True).start()
+            self._queues = queues
+
+    def _worker(self, q: "queue.Queue[_Delivery]"):
+        while True:
+            delivery = q.get()
+            if delivery.coalesce_key is not None:
+                # From here on, a new emit must queue a fresh delivery
+                with self._lock:
+                    self._pending.pop((delivery.event_name, delivery.callback, delivery.coalesce_key), None)
+            self._deliver(delivery)
+
+    def _deliver(self, delivery: _Delivery):
+        failed = False
+        try:
+            delivery.callback(**delivery.kwargs)
+        except Exception as e:
+            failed = True
+            name = getattr(delivery.callback, "__name__", repr(delivery.callback))
+            print(f"[EVENT] Subscriber {name} failed on {delivery.event_name}: {e}")
+
+        latency = time.perf_counter() - delivery.enqueued_at
+        EVENT_DISPATCH_SECONDS.observe(latency, event=delivery.event_name)
+        with self._lock:
+            self.errors += failed
+            stats = self._stats.setdefault(
+                delivery.event_name, {"delivered": 0, "total_latency_s": 0.0, "max_latency_s": 0.0}
+            )
+            stats["delivered"] += 1
+            stats["total_latency_s"] += latency
+            stats["max_latency_s"] = max(stats["max_latency_s"], latency)
 
-    def subscribe(self, event_name: str, callback: Callable):
-        """Subscribe a callback to an event"""
-        if event_name not in self._subscribers:
-            self._subscribers[event_name] = []
-        self._subscribers[event_name].append(callback)
-
-    def emit(self, event_name: str, **kwargs):
-        """Emit an event to all subscribers"""
-        if event_name in self._subscribers:
-            for callback in self._subscribers[event_name]:
-                callback(**kwargs)
+    def stats(self) -> dict:
+        """Dispatch statistics: per-event delivery latency and queue depths."""
+        with self._lock:
+            events = {
+                name: {
+                    "delivered": s["delivered"],
+                    "avg_latency_ms": 1000 * s["total_latency_s"] / s["delivered"],
+                    "max_latency_ms": 1000 * s["max_latency_s"],
+                }
+                for name, s in self._stats.items()
+            }
+        return {
+            "mode": self.mode,
+            "workers": self.workers,
+            "queue_size": self.queue_size,
+            "queue_depths": [q.qsize() for q in self._queues],
+            "dropped": self.dropped,
+            "coalesced": self.coalesced,
+            "errors": self.errors,
+            "events": events,
+        }
 
 # Create a global event manager instance
 event_manager = EventManager()
@@ -0,0 +1,143 @@
+import heapq
+import itertools
+import threading
+from datetime import datetime
+from typing import Callable, Dict, List, Tuple
+from app.core.config import settings
+from app.events.event_manager import event_manager
+from app.events.ai_monitor import monitor_printer
+
+
+class MonitorScheduler:
+    """
+    Runs AI monitors with a concurrency cap and a priority admission queue.
+    At most `max_concurrent` monitors run at once; further jobs wait in a
+    bounded queue (highest priority first, then FIFO). Each monitor gets a
+    stop event so it can be cancelled when its job ends.
+    """
+
+    def __init__(self, runner: Callable[[dict, threading.Event], None], max_concurrent: int, max_queued: int):
+        self._runner = runner
+        self.max_concurrent = max(1, max_concurrent)
+        self.max_queued = max_queued
+        self._lock = threading.Lock()
+        self._seq = itertools.count()
+        # Heap of (-priority, seq, job_id), one entry per queued job
+        self._heap: List[Tuple[int, int, int]] = []
+        self._queued: Dict[int, dict] = {}
+        self._active: Dict[int, dict] = {}
+
+    def submit(self, job: dict, priority: int = 0) -> str:
+        """Start or queue a monitor for a job. Returns "running", "queued" or "rejected"."""
+        with self._lock:
+            if job["id"] in self._active or job["id"] in self._queued:
+                return "running" if job["id"] in self._active else "queued"
+
+            if len(self._active) < self.max_concurrent:
+                self._start(job, priority)
+                return "running"
+
+            if len(self._queued) >= self.max_queued:
+                rejected = True
+            else:
+                rejected = False
+                self._queued[job["id"]] = {
+                    "job": job,
+                    "priority": priority,
+                    "queued_at": datetime.utcnow(),
+                }
+                heapq.heappush(self._heap, (-priority, next(self._seq), job["id"]))
+
+        if rejected:
+            error_msg = f"Monitor queue is full ({self.max_queued} jobs waiting)"
+            print(f"[AI] ERROR: {error_msg}")
+            event_manager.emit("job_monitoring_failed", job=job, error=error_msg)
+            return "rejected"
+
+        print(f"[AI] Job {job['id']} queued for monitoring (priority {priority})")
+        return "queued"
+
+    def cancel(self, job_id: int) -> bool:
+        """Stop a running monitor or drop a queued one. Returns False if unknown."""
+        with self._lock:
+            if self._queued.pop(job_id, None) is not None:
+                # The queue is bounded by max_queued, so a rebuild is cheap
+                self._heap = [item for item in self._heap if item[2] != job_id]
+                heapq.heapify(self._heap)
+                return True
+            entry = self._active.get(job_id)
+            if entry is None:
+                return False
+            entry["stop"].set()
+            return True
+
+    def snapshot(self) -> dict:
+        """Active and queued monitors."""
+        with self._lock:
+            active = [
+                {
+                    "job_id": job_id,
+                    "printer_id": entry["job"]["printer_id"],
+                    "priority": entry["priority"],
+                    "started_at": entry["started_at"],
+                    "stopping": entry["stop"].is_set(),
+                }
+                for job_id, entry in self._active.items()
+            ]
+            queued = [
+                {
+                    "job_id": job_id,
+                    "printer_id": self._queued[job_id]["job"]["printer_id"],
+                    "priority": self._queued[job_id]["priority"],
+                    "queued_at": self._queued[job_id]["queued_at"],
+                }
+                for _, _, job_id in sorted(self._heap)
+                if job_id in self._queued
+            ]
+        return {
+            "max_concurrent": self.max_concurrent,
+            "max_queued": self.max_queued,
+            "active": active,
+            "queued": queued,
+        }
+
+    def _start(self, job: dict, priority: int):
+        """Start a monitor thread. Caller holds the lock."""
+        stop = threading.Event()
+        thread = threading.Thread(target=self._run, args=(job, stop), daemon=True)
+        self._active[job["id"]] = {
+            "job": job,
+            "priority": priority,
+            "stop": stop,
+            "thread": thread,
+            "started_at": datetime.utcnow(),
+        }
+        thread.start()
+
+    def _run(self, job: dict, stop: threading.Event):
+        try:
+            self._runner(job, stop)
+        except Exception as e:
+            error_msg = f"Failed to start AI monitor for job {job['id']}: {str(e)}"
+            print(f"[AI] ERROR: {error_msg}")
+            event_manager.emit("job_monitoring_failed", job=job, error=error_msg)
+        finally:
+            with self._lock:
+                self._active.pop(job["id"], None)
+                self._admit_next()
+
+    def _admit_next(self):
+        """Start queued monitors while there is capacity. Caller holds the lock."""
+        while self._heap and len(self._active) < self.max_concurrent:
+            _, _, job_id = heapq.heappop(self._heap)
+            entry = self._queued.pop(job_id, None)
+            if entry is not None:
+                self._start(entry["job"], entry["priority"])
+
+
+# Global scheduler running monitor_printer for every monitored job
+monitor_scheduler = MonitorScheduler(
+    monitor_printer,
+    max_concurrent=settings.MAX_CONCURRENT_MONITORS,
+    max_queued=settings.MONITOR_QUEUE_SIZE,
+)
@@ -0,0 +1,186 @@
+import json
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, Iterable, List, Optional, Set
+from fastapi.encoders import jsonable_encoder
+from app.core.config import settings
+
+# Events forwarded to push clients as they are (job progress is throttled separately)
+PUSHED_EVENTS = ("job_created", "job_finished", "job_failed", "job_monitoring_failed", "printer_registered")
+
+
+class PushClient:
+    """One connected stream: its filters and a bounded buffer of encoded messages."""
+
+    def __init__(
+        self,
+        printer_ids: Optional[Iterable[int]],
+        job_ids: Optional[Iterable[int]],
+        max_queued: int,
+        notify: Callable[[], None],
+    ):
+        self.printer_ids: Optional[Set[int]] = set(printer_ids) if printer_ids else None
+        self.job_ids: Optional[Set[int]] = set(job_ids) if job_ids else None
+        self.max_queued = max(1, max_queued)
+        self._notify = notify
+        self._lock = threading.Lock()
+        self._buffer: deque = deque()
+        self._overflowed = False
+        self.sent = 0
+        self.dropped = 0
+
+    def wants(self, printer_id: Optional[int], job_id: Optional[int]) -> bool:
+        if self.printer_ids is not None and printer_id not in self.printer_ids:
+            return False
+        if self.job_ids is not None and job_id not in self.job_ids:
+            return False
+        return True
+
+    def offer(self, message: str):
+        """Queue a message. A full buffer drops its oldest and asks the client to resync."""
+        with self._lock:
+            if len(self._buffer) >= self.max_queued:
+                self._buffer.popleft()
+                self.dropped += 1
+                self._overflowed = True
+            self._buffer.append(message)
+        self._notify()
+
+    def drain(self) -> List[str]:
+        """Take everything queued so far."""
+        with self._lock:
+            messages = list(self._buffer)
+            self._buffer.clear()
+            if self._overflowed:
+                # Updates were lost: the client must refetch state it cares about
+                messages.insert(0, 'event: resync\ndata: {}\n\n')
+                self._overflowed = False
+        self.sent += len(messages)
+        return messages
+
+
+class PushHub:
+    """
+    Fans job and printer events out to connected dashboards.
+    Each event is encoded once as a server-sent event and queued to every
+    client whose printer/job filter matches. Progress is sent as small
+    deltas at most once per progress_interval_s per job; the latest
+    skipped value is sent when the interval ends.
+    """
+
+    def __init__(self, max_queued: int, progress_interval_s: float):
+        self.max_queued = max_queued
+        self.progress_interval = progress_interval_s
+        self._lock = threading.Lock()
+        self._clients: Set[PushClient] = set()
+        self._seq = 0
+
+        # Progress throttling: last send time and the latest held-back delta, per job
+        self._progress_sent: Dict[int, float] = {}
+        self._deferred: Dict[int, dict] = {}
+        self._flusher: Optional[threading.Thread] = None
+
+        # Stats
+        self.published = 0
+        self.progress_throttled = 0
+
+    def connect(
+        self,
+        notify: Callable[[], None],
+        printer_ids: Optional[Iterable[int]] = None,
+        job_ids: Optional[Iterable[int]] = None,
+    ) -> PushClient:
+        """Register a client; notify is called (from any thread) when it has messages."""
+        client = PushClient(printer_ids, job_ids, self.max_queued, notify)
+        with self._lock:
+            self._clients.add(client)
+        return client
+
+    def disconnect(self, client: PushClient):
+        with self._lock:
+            self._clients.discard(client)
+
+    def publish(self, event_name: str, payload: dict, printer_id: Optional[int], job_id: Optional[int]):
+        """Send an event to every interested client."""
+        with self._lock:
+            clients = [c for c in self._clients if c.wants(printer_id, job_id)]
+            if not clients:
+                return
+            self._seq += 1
+            seq = self._seq
+            self.published += 1
+        message = f"id: {seq}\nevent: {event_name}\ndata: {json.dumps(jsonable_encoder(payload))}\n\n"
+        for client in clients:
+            client.offer(message)
+
+    def forward(self, event_name: str) -> Callable:
+        """Event subscriber pushing event_name to clients."""
+        def push(job: Optional[dict] = None, printer: Optional[dict] = None, **kwargs):
+            if job is not None:
+                with self._lock:
+                    # The job's own event carries its latest progress
+                    self._deferred.pop(job["id"], None)
+                    if event_name in ("job_finished", "job_failed"):
+                        self._progress_sent.pop(job["id"], None)
+                self.publish(event_name, {"job": job, **kwargs}, job["printer_id"], job["id"])
+            elif printer is not None:
+                self.publish(event_name, {"printer": printer, **kwargs}, printer["id"], None)
+        push.__name__ = f"push_{event_name}"
+        return push
+
+    def forward_progress(self, job: dict, **kwargs):
+        """job_progress subscriber: throttled progress deltas."""
+        if not self._clients:
+            return
+        delta = {
+            "job_id": job["id"],
+            "printer_id": job["printer_id"],
+            "progress": job["progress"],
+            "status": job["status"],
+        }
+        now = time.monotonic()
+        with self._lock:
+            if now - self._progress_sent.get(job["id"], float("-inf")) < self.progress_interval:
+                self._deferred[job["id"]] = delta
+                self.progress_throttled += 1
+                self._ensure_flusher()
+                return
+            self._progress_sent[job["id"]] = now
+        self.publish("job_progress", delta, delta["printer_id"], delta["job_id"])
+
+    def _ensure_flusher(self):
+        """Caller holds the lock."""
+        if self._flusher is None:
+            self._flusher = threading.Thread(target=self._flush_loop, daemon=True)
+            self._flusher.start()
+
+    def _flush_loop(self):
+        while True:
+            time.sleep(self.progress_interval / 4)
+            now = time.monotonic()
+            with self._lock:
+                due = [
+                    self._deferred.pop(job_id)
+                    for job_id in list(self._deferred)
+                    if now - self._progress_sent.get(job_id, float("-inf")) >= self.progress_interval
+                ]
+                for delta in due:
+                    self._progress_sent[delta["job_id"]] = now
+            for delta in due:
+                self.publish("job_progress", delta, delta["printer_id"], delta["job_id"])
+
+    def stats(self) -> dict:
+        with self._lock:
+            clients = list(self._clients)
+        return {
+            "clients": len(clients),
+            "published": self.published,
+            "progress_throttled": self.progress_throttled,
+            "dropped": sum(c.dropped for c in clients),
+            "queued": sum(len(c._buffer) for c in clients),
+        }
+
+
+# Global hub behind /api/events/stream
+push_hub = PushHub(settings.PUSH_CLIENT_QUEUE_SIZE, settings.PUSH_PROGRESS_INTERVAL_S)
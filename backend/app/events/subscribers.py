@@ -1,6 +1,6 @@
-import threading
 from app.events.event_manager import event_manager
-from app.events.ai_monitor import monitor_printer
+from app.events.monitor_scheduler import monitor_scheduler
+from app.events.push_hub import push_hub, PUSHED_EVENTS
 
 
 # -------------------------
@@ -29,30 +29,23 @@ def notify_user(job):
 # AI STARTER
 # -------------------------
 def start_ai_monitor(job):
-    """Start AI monitoring thread with error handling."""
+    """Hand the job to the monitor scheduler (runs now or queues it)."""
     print(f"[AI] Starting monitor for job {job['id']}")
+    monitor_scheduler.submit(job, priority=job.get("priority", 0))
 
-    def monitor_with_error_handling():
-        """Wrapper to catch and log any errors during monitoring startup."""
-        try:
-            monitor_printer(job)
-        except Exception as e:
-            error_msg = f"Failed to start AI monitor for job {job['id']}: {str(e)}"
-            print(f"[AI] ERROR: {error_msg}")
-            # Emit error event if monitoring fails to start
-            event_manager.emit("job_monitoring_failed", job=job, error=error_msg)
 
-    t = threading.Thread(
-        target=monitor_with_error_handling,
-        daemon=True
-    )
-    t.start()
+def stop_ai_monitor(job, **kwargs):
+    """Stop (or unqueue) the job's monitor once the job is over."""
+    if monitor_scheduler.cancel(job["id"]):
+        print(f"[AI] Stopping monitor for job {job['id']}")
 
 
 # -------------------------
 # SUBSCRIPTIONS
 # -------------------------
 event_manager.subscribe("job_created", start_ai_monitor)
+event_manager.subscribe("job_finished", stop_ai_monitor)
+event_manager.subscribe("job_failed", stop_ai_monitor)
 
 event_manager.subscribe("job_finished", log_job_event)
 event_manager.subscribe("job_failed", log_job_event)
@@ -60,3 +53,8 @@ event_manager.subscribe("job_monitoring_failed", log_job_event)
 
 event_manager.subscribe("job_finished", notify_user)
 event_manager.subscribe("job_failed", notify_user)
+
+# Push to dashboards; one shared worker keeps progress and state changes in order
+for event_name in PUSHED_EVENTS:
+    event_manager.subscribe(event_name, push_hub.forward(event_name), worker_key=push_hub)
+event_manager.subscribe("job_progress", push_hub.forward_progress, worker_key=push_hub)
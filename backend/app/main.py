@@ -1,3 +1,5 @@
+import threading
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
@@ -6,11 +8,34 @@ from app.api.printers import router as printer_router
 from app.api.jobs import router as jobs_router
 from app.api.auth import router as auth_router
 from app.api.camera import router as camera_router
+from app.api.monitors import router as monitors_router
+from app.api.system import router as system_router
+from app.api.events import router as events_router
+from app.api.recordings import router as recordings_router
+from app.api.metrics import router as metrics_router
+from app.core.config import settings
+from app.core.metrics import HTTP_REQUEST_SECONDS, MetricsMiddleware
+from app.core.password_hasher import password_hasher
+from app.events.ai_monitor import warmup_model
+from app.services.recorder import recorder
 import app.events.subscribers
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Load and warm up the model in the background so startup isn't blocked
+    # and the first job doesn't pay the load + first-inference latency
+    if settings.MODEL_WARMUP:
+        threading.Thread(target=warmup_model, daemon=True).start()
+    yield
+    password_hasher.shutdown()
+    recorder.shutdown()
+
+
 app = FastAPI(
     title="Smart 3D Printing Backend",
-    version="0.2.0"
+    version="0.2.0",
+    lifespan=lifespan
 )
 
 # CORS middleware
@@ -22,11 +47,21 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Request latency per route, exported on /metrics
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware, histogram=HTTP_REQUEST_SECONDS)
+
 # Include routers
 app.include_router(auth_router, prefix="/api/auth", tags=["Authentication"])
 app.include_router(printer_router, prefix="/api/printers", tags=["Printers"])
 app.include_router(jobs_router, prefix="/api/jobs", tags=["Print Jobs"])
 app.include_router(camera_router, prefix="/api/camera", tags=["Camera"])
+app.include_router(monitors_router, prefix="/api/monitors", tags=["Monitors"])
+app.include_router(system_router, prefix="/api/system", tags=["System"])
+app.include_router(events_router, prefix="/api/events", tags=["Events"])
+app.include_router(recordings_router, prefix="/api/recordings", tags=["Recordings"])
+if settings.METRICS_ENABLED:
+    app.include_router(metrics_router, tags=["System"])
 
 # Serve frontend static files
 frontend_path = Path(__file__).parent.parent.parent / "frontend"
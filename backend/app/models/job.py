@@ -1,11 +1,12 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
 
 class PrintJobCreate(BaseModel):
     printer_id: int
     file_name: str
     user_email: Optional[str] = None
+    priority: int = 0   # higher is monitored first when monitors are saturated
 
 class PrintJob(BaseModel):
     id: int
@@ -16,3 +17,16 @@ class PrintJob(BaseModel):
     created_at: datetime
     finished_at: Optional[datetime] = None
     user_email: Optional[str] = None
+    priority: int = 0
+
+class ProgressUpdate(BaseModel):
+    job_id: int
+    progress: float
+
+class ProgressBatch(BaseModel):
+    updates: List[ProgressUpdate]
+
+class ProgressBatchResult(BaseModel):
+    updated: int
+    finished: List[int]     # jobs that crossed 100% in this batch
+    not_found: List[int]
@@ -0,0 +1,11 @@
+from pydantic import BaseModel
+from app.core.config import settings
+
+class SamplingPolicy(BaseModel):
+    """How often a printer's monitor runs inference (see app.ai.sampling)."""
+    enabled: bool = settings.ADAPTIVE_SAMPLING
+    min_interval_s: float = settings.SAMPLING_MIN_INTERVAL_S      # near 100% progress
+    max_interval_s: float = settings.SAMPLING_MAX_INTERVAL_S      # at the start of a print
+    burst_interval_s: float = settings.SAMPLING_BURST_INTERVAL_S  # while a suspected failure is checked
+    burst_duration_s: float = settings.SAMPLING_BURST_DURATION_S
+    stable_after_s: float = settings.SAMPLING_STABLE_AFTER_S      # dense sampling after a detection change
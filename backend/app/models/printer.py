@@ -5,6 +5,7 @@ from datetime import datetime
 class PrinterCreate(BaseModel):
     name: str
     location: Optional[str] = None
+    camera_source: Optional[str] = None  # device index, file or stream URL
 
 class Printer(BaseModel):
     id: int
@@ -12,3 +13,4 @@ class Printer(BaseModel):
     location: Optional[str]
     status: str
     created_at: datetime
+    camera_source: Optional[str] = None
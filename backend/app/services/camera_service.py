@@ -1,87 +1,297 @@
 import cv2
 import threading
+import time
 import numpy as np
-from typing import Optional
+from contextlib import contextmanager
+from typing import Dict, Hashable, Iterator, Optional, Tuple, Union
 from app.core.config import settings
+from app.core.metrics import CAMERA_STAGE_SECONDS, camera_fps
+from app.ai.annotate import draw_detections
+from app.services.printer_service import get_printer
+from app.services.frame_buffer import FrameRing
+from app.services.frame_sources import open_frame_source
+from app.services.stream_broadcaster import FrameBroadcaster
+
+# Capture source: a device index, a frame source (synthetic://, folder://,
+# video://) or anything cv2.VideoCapture opens (file, URL)
+CameraSource = Union[int, str]
+
+
+def parse_camera_source(source: Optional[str]) -> CameraSource:
+    """Turn a configured camera source into a device index or a path/URL."""
+    if source is None or source == "":
+        return default_camera_source()
+    return int(source) if source.strip().isdigit() else source
+
+
+def default_camera_source() -> CameraSource:
+    """Source of the default camera: CAMERA_SOURCE if set, else device CAMERA_INDEX."""
+    if settings.CAMERA_SOURCE:
+        return parse_camera_source(settings.CAMERA_SOURCE)
+    return settings.CAMERA_INDEX
+
 
 class CameraService:
-    """Service for managing camera access and frame streaming."""
-    
-    def __init__(self):
+    """
+    Service for managing camera access and frame streaming.
+    A background thread owns the capture device and writes raw frames into
+    a FrameRing; consumers read sequence-numbered, read-only views of it
+    and never wait behind a hardware read. The AI monitor only attaches
+    its latest detections; boxes are drawn by render() when a viewer
+    actually needs a frame.
+    """
+
+    def __init__(self, source: Optional[CameraSource] = None):
         self.camera: Optional[cv2.VideoCapture] = None
-        self.current_frame: Optional[np.ndarray] = None
         self.lock = threading.Lock()
-        self.camera_index = settings.CAMERA_INDEX
+        self.lifecycle_lock = threading.RLock()
+        self.camera_index = source if source is not None else default_camera_source()
         self.is_running = False
-    
-    def start_camera(self, camera_index: Optional[int] = None) -> bool:
+        self.ring = FrameRing(settings.CAMERA_RING_SLOTS)
+        self._capture_thread: Optional[threading.Thread] = None
+
+        # Latest detections of each AI monitor using this camera, by job id.
+        # Replaced, never mutated, so render() can read it without the lock
+        self._detections: Dict[Hashable, list] = {}
+
+        self.broadcaster = FrameBroadcaster(self)
+
+    def start_camera(self, camera_index: Optional[CameraSource] = None) -> bool:
         """Start camera capture."""
+        # Serializes opening/closing so concurrent users never open the device twice
+        with self.lifecycle_lock:
+            return self._start_camera(camera_index)
+
+    def _start_camera(self, camera_index: Optional[CameraSource]) -> bool:
         if self.is_running and self.camera is not None:
             return True
-        
+
         index = camera_index if camera_index is not None else self.camera_index
-        
+
         try:
-            cap = cv2.VideoCapture(index)
+            cap = open_frame_source(index)
             if not cap.isOpened():
                 return False
-            
+
             # Test if we can read a frame
             ret, frame = cap.read()
             if not ret:
                 cap.release()
                 return False
-            
+
             with self.lock:
                 self.camera = cap
-                self.current_frame = frame
                 self.is_running = True
                 self.camera_index = index
-            
+                # Sequence numbers keep increasing across restarts: stream
+                # clients and the broadcaster compare against older seqs
+                self.ring = FrameRing(settings.CAMERA_RING_SLOTS, start_seq=self.ring.seq)
+                self.ring.publish(frame)
+                self._detections = {}
+                self._capture_thread = threading.Thread(
+                    target=self._capture_loop, args=(cap, self.ring), daemon=True
+                )
+                self._capture_thread.start()
+
             return True
         except Exception as e:
             print(f"[Camera] Error starting camera: {e}")
             return False
-    
+
     def stop_camera(self):
         """Stop camera capture."""
+        with self.lifecycle_lock:
+            self._stop_camera()
+
+    def _stop_camera(self):
         with self.lock:
-            if self.camera is not None:
-                self.camera.release()
-                self.camera = None
-            self.current_frame = None
+            cap, self.camera = self.camera, None
+            thread, self._capture_thread = self._capture_thread, None
             self.is_running = False
-    
-    def update_frame(self, frame: np.ndarray):
-        """Update the current frame (called by AI monitor)."""
+            self._detections = {}
+            self.ring.close()
+
+        # Let the capture thread finish its current read before releasing
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout=2.0)
+        if cap is not None:
+            cap.release()
+
+    def _capture_loop(self, cap: cv2.VideoCapture, ring: FrameRing):
+        """Read frames into the ring until the camera is stopped."""
+        failures = 0
+        label = str(self.camera_index)
+        while self.is_running and self.camera is cap:
+            buffer = ring.writable_buffer()
+            # Reading into the slot's buffer avoids allocating a frame per read
+            start = time.perf_counter()
+            ret, frame = cap.read(buffer) if buffer is not None else cap.read()
+            CAMERA_STAGE_SECONDS.observe(time.perf_counter() - start, camera=label, stage="read")
+            if not ret:
+                failures += 1
+                if failures % 50 == 0:
+                    print(f"[Camera] {failures} consecutive read failures on camera {self.camera_index}")
+                time.sleep(0.05)
+                continue
+            failures = 0
+            ring.publish(frame)
+            camera_fps.mark(label)
+
+    @property
+    def frame_seq(self) -> int:
+        """Sequence number of the newest frame."""
+        return self.ring.seq
+
+    @property
+    def current_frame(self) -> Optional[np.ndarray]:
+        """Newest raw frame (read-only view). None when the camera is stopped."""
+        if not self.is_running:
+            return None
+        return self.ring.latest()[1]
+
+    def publish_detections(self, detections: Optional[list], owner: Hashable = None):
+        """
+        Attach an AI monitor's latest detections (None to clear them). Each
+        owner (the monitor's job id) has its own set, so a monitor that
+        stops doesn't clear the boxes of others sharing the camera.
+        Nothing is drawn here: unwatched cameras pay no annotation cost.
+        """
         with self.lock:
-            self.current_frame = frame.copy() if frame is not None else None
-    
+            layers = dict(self._detections)
+            if detections is None:
+                layers.pop(owner, None)
+            else:
+                layers[owner] = detections
+            self._detections = layers
+
+    def render(self, frame: np.ndarray) -> np.ndarray:
+        """Frame as viewers see it: with the latest detections drawn on a copy, if any."""
+        detections = [d for layer in self._detections.values() for d in layer]
+        if not detections:
+            return frame
+        return draw_detections(frame.copy(), detections)
+
     def get_latest_frame(self) -> Optional[np.ndarray]:
-        """Get the latest frame."""
-        with self.lock:
-            if self.current_frame is not None:
-                return self.current_frame.copy()
-            elif self.camera is not None and self.camera.isOpened():
-                ret, frame = self.camera.read()
-                if ret:
-                    self.current_frame = frame
-                    return frame.copy()
-        return None
-    
-    def read_frame(self) -> Optional[np.ndarray]:
-        """Read a new frame from camera."""
-        with self.lock:
-            if self.camera is not None and self.camera.isOpened():
-                ret, frame = self.camera.read()
-                if ret:
-                    self.current_frame = frame
-                    return frame
-        return None
-    
+        """Get the latest raw frame as a read-only view."""
+        return self.current_frame
+
+    def read_frame(self, timeout: float = 1.0) -> Optional[np.ndarray]:
+        """Wait for the next raw frame from the camera (read-only view)."""
+        if not self.is_running:
+            return None
+        _, frame = self.ring.wait_next(self.ring.seq, timeout)
+        return frame
+
+    def wait_for_raw_frame(self, after_seq: int, timeout: Optional[float] = None) -> Tuple[int, Optional[np.ndarray]]:
+        """Wait for a raw frame newer than after_seq; returns (seq, read-only view)."""
+        return self.ring.wait_next(after_seq, timeout)
+
+    @contextmanager
+    def pinned_frame(self, seq: int) -> Iterator[Optional[np.ndarray]]:
+        """Keep raw frame `seq` from being overwritten while it is processed."""
+        with self.ring.pinned(seq) as frame:
+            yield frame
+
+    def wait_for_frame(self, after_seq: int, timeout: Optional[float] = None) -> Tuple[int, Optional[np.ndarray]]:
+        """
+        Wait for a frame newer than after_seq and return (seq, frame).
+        The frame is shared, not copied: treat it as read-only. Returns
+        (after_seq, None) on timeout or when the camera stops.
+        """
+        if not self.is_running:
+            return after_seq, None
+        return self.ring.wait_next(after_seq, timeout)
+
     def is_available(self) -> bool:
         """Check if camera is available."""
         return self.is_running and self.camera is not None and self.camera.isOpened()
 
-# Global camera service instance
-camera_service = CameraService()
+
+class CameraRegistry:
+    """
+    One CameraService per capture source, looked up by printer.
+    Printers use their `camera_source` (falling back to the default camera).
+    Monitors and stream clients acquire() a printer's camera and release()
+    it when done; the device is opened on first use and closed once its
+    last user is gone, so concurrent jobs never steal each other's camera.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._cameras: Dict[CameraSource, CameraService] = {}
+        self._refs: Dict[CameraSource, int] = {}
+
+    def source_for(self, printer_id: Optional[int]) -> Optional[CameraSource]:
+        """Capture source of a printer (None for the default camera). None if the printer is unknown."""
+        if printer_id is None:
+            return default_camera_source()
+        printer = get_printer(printer_id)
+        if printer is None:
+            return None
+        return parse_camera_source(printer.get("camera_source"))
+
+    def get(self, printer_id: Optional[int] = None) -> Optional[CameraService]:
+        """Camera service for a printer, without opening it. None if the printer is unknown."""
+        source = self.source_for(printer_id)
+        if source is None:
+            return None
+        with self._lock:
+            camera = self._cameras.get(source)
+            if camera is None:
+                camera = self._cameras[source] = CameraService(source)
+            return camera
+
+    def acquire(self, printer_id: Optional[int] = None) -> Optional[CameraService]:
+        """Open (if needed) and take a reference to a printer's camera. None if unavailable."""
+        camera = self.get(printer_id)
+        if camera is None:
+            return None
+        source = camera.camera_index
+        with self._lock:
+            self._refs[source] = self._refs.get(source, 0) + 1
+        if not camera.start_camera():
+            self._release_source(source)
+            return None
+        return camera
+
+    def release(self, printer_id: Optional[int] = None):
+        """Drop a reference taken with acquire(); the camera closes when idle."""
+        source = self.source_for(printer_id)
+        if source is not None:
+            self._release_source(source)
+
+    def _release_source(self, source: CameraSource):
+        with self._lock:
+            refs = self._refs.get(source, 0) - 1
+            if refs > 0:
+                self._refs[source] = refs
+                return
+            self._refs.pop(source, None)
+            camera = self._cameras.get(source)
+        if camera is None:
+            return
+
+        with camera.lifecycle_lock:
+            # Someone may have acquired it again while we waited for the lock
+            with self._lock:
+                if self._refs.get(source, 0) > 0:
+                    return
+            camera.stop_camera()
+        print(f"[Camera] Released idle camera {source}")
+
+    def active(self) -> Dict[CameraSource, int]:
+        """Reference counts of cameras currently in use."""
+        with self._lock:
+            return dict(self._refs)
+
+    def stream_clients(self) -> Dict[CameraSource, int]:
+        """Stream clients per camera."""
+        with self._lock:
+            cameras = list(self._cameras.items())
+        return {source: camera.broadcaster.subscribers for source, camera in cameras}
+
+
+# Global registry, and the default camera (CAMERA_SOURCE or CAMERA_INDEX) used by the
+# printer-less endpoints
+camera_registry = CameraRegistry()
+camera_service = camera_registry.get()
@@ -0,0 +1,112 @@
+import threading
+import time
+import numpy as np
+from contextlib import contextmanager
+from typing import Iterator, List, Optional, Tuple
+
+
+def _readonly(buffer: np.ndarray) -> np.ndarray:
+    view = buffer.view()
+    view.flags.writeable = False
+    return view
+
+
+class FrameRing:
+    """
+    Small ring of reusable frame buffers with monotonic sequence numbers.
+    A single writer (the capture thread) fills the buffer returned by
+    writable_buffer() in place and publishes it; readers get read-only
+    views without copying. A view stays valid until its slot is reused,
+    i.e. for about `slots` newer frames; readers that need a frame for
+    longer pin it, and the writer skips pinned slots.
+    A ring replacing another one (camera restart) continues from its
+    start_seq, so readers' "newer than" checks keep working across it.
+    """
+
+    def __init__(self, slots: int = 8, start_seq: int = 0):
+        self.slots = max(2, slots)
+        self._buffers: List[Optional[np.ndarray]] = [None] * self.slots
+        self._seqs: List[int] = [0] * self.slots
+        self._timestamps: List[float] = [0.0] * self.slots
+        self._pins: List[int] = [0] * self.slots
+        self._write_index = 0
+        self._cond = threading.Condition()
+        self.seq = start_seq
+        self.closed = False
+
+    def writable_buffer(self) -> Optional[np.ndarray]:
+        """
+        Buffer to fill with the next frame (None until the first frame sets
+        the shape). None too when every slot is pinned: the writer then
+        reads into a fresh array, which replaces the oldest slot's buffer
+        while its pinned holders keep the old one.
+        """
+        with self._cond:
+            unpinned = [i for i in range(self.slots) if self._pins[i] == 0]
+            self._write_index = min(unpinned or range(self.slots), key=lambda i: self._seqs[i])
+            return self._buffers[self._write_index] if unpinned else None
+
+    def publish(self, frame: np.ndarray, timestamp: Optional[float] = None) -> int:
+        """
+        Publish the frame written into writable_buffer(). A different array
+        (first frame, or a resolution change) is adopted as the slot buffer.
+        """
+        with self._cond:
+            index = self._write_index
+            self._buffers[index] = frame
+            self.seq += 1
+            self._seqs[index] = self.seq
+            self._timestamps[index] = timestamp if timestamp is not None else time.time()
+            self._cond.notify_all()
+            return self.seq
+
+    def _index_of(self, seq: int) -> Optional[int]:
+        for i in range(self.slots):
+            if self._seqs[i] == seq and self._buffers[i] is not None:
+                return i
+        return None
+
+    def get(self, seq: int) -> Optional[np.ndarray]:
+        """Read-only view of frame `seq`, or None if it has been overwritten."""
+        with self._cond:
+            index = self._index_of(seq)
+            return _readonly(self._buffers[index]) if index is not None else None
+
+    def timestamp(self, seq: int) -> Optional[float]:
+        """Capture time of frame `seq`, or None if it has been overwritten."""
+        with self._cond:
+            index = self._index_of(seq)
+            return self._timestamps[index] if index is not None else None
+
+    def latest(self) -> Tuple[int, Optional[np.ndarray]]:
+        """(seq, read-only view) of the newest frame."""
+        with self._cond:
+            return self.seq, self.get(self.seq) if self.seq else None
+
+    def wait_next(self, after_seq: int, timeout: Optional[float] = None) -> Tuple[int, Optional[np.ndarray]]:
+        """Wait for a frame newer than after_seq. Returns (after_seq, None) on timeout or close."""
+        with self._cond:
+            self._cond.wait_for(lambda: self.seq > after_seq or self.closed, timeout)
+            if self.seq > after_seq:
+                return self.seq, self.get(self.seq)
+        return after_seq, None
+
+    @contextmanager
+    def pinned(self, seq: int) -> Iterator[Optional[np.ndarray]]:
+        """Keep frame `seq` from being overwritten while the block runs."""
+        with self._cond:
+            index = self._index_of(seq)
+            if index is not None:
+                self._pins[index] += 1
+        try:
+            yield self.get(seq) if index is not None else None
+        finally:
+            if index is not None:
+                with self._cond:
+                    self._pins[index] -= 1
+
+    def close(self):
+        """Wake all waiters; the ring returns no new frames after this."""
+        with self._cond:
+            self.closed = True
+            self._cond.notify_all()
@@ -0,0 +1,142 @@
+"""
+Frame sources CameraService can capture from instead of a webcam.
+Each has the part of the cv2.VideoCapture interface the capture loop
+uses (isOpened, read into an optional buffer, release), so benchmarks
+and demos run without a physical camera. Sources are chosen by their
+camera source string:
+
+    synthetic://640x480@30   generated frames (size and rate optional)
+    folder:///path/to/imgs   images of a folder, in name order, looped
+    video:///path/to/file    a video file, looped, at its own frame rate
+
+Anything else (device index, file, URL) goes to cv2.VideoCapture.
+"""
+import os
+import re
+import time
+from typing import List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+_IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp")
+
+
+class _PacedSource:
+    """Base for sources that deliver frames at a fixed rate like a camera would."""
+
+    def __init__(self, fps: float):
+        self.fps = fps
+        self._next = time.monotonic()
+        self.frames = 0
+
+    def _pace(self):
+        if self.fps <= 0:
+            return
+        now = time.monotonic()
+        if self._next > now:
+            time.sleep(self._next - now)
+        # Don't try to catch up after a stall, just keep the rate from here
+        self._next = max(self._next, now) + 1 / self.fps
+
+    def isOpened(self) -> bool:
+        return True
+
+    def release(self):
+        pass
+
+
+class SyntheticSource(_PacedSource):
+    """
+    Generated frames: a fixed background with a block moving across it and
+    a frame counter, so motion gating and encoding see realistic changes.
+    """
+
+    def __init__(self, width: int = 640, height: int = 480, fps: float = 30.0, seed: int = 0):
+        super().__init__(fps)
+        rng = np.random.default_rng(seed)
+        gradient = np.linspace(40, 200, width, dtype=np.uint8)
+        self._background = np.empty((height, width, 3), dtype=np.uint8)
+        self._background[:] = gradient[None, :, None]
+        # Texture, so JPEG sizes resemble a real scene rather than a flat image
+        self._background += rng.integers(0, 24, size=(height, width, 3), dtype=np.uint8)
+        self.width, self.height = width, height
+
+    def read(self, image: Optional[np.ndarray] = None) -> Tuple[bool, np.ndarray]:
+        self._pace()
+        if image is None or image.shape != self._background.shape:
+            image = np.empty_like(self._background)
+        np.copyto(image, self._background)
+        size = self.height // 6
+        x = (self.frames * 4) % max(1, self.width - size)
+        y = self.height // 2 - size // 2
+        image[y:y + size, x:x + size] = (30, 30, 220)
+        cv2.putText(image, str(self.frames), (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 1.0, (255, 255, 255), 2)
+        self.frames += 1
+        return True, image
+
+
+class FolderSource(_PacedSource):
+    """Images of a folder in name order, looped. Images are decoded once when opened."""
+
+    def __init__(self, path: str, fps: float = 10.0):
+        super().__init__(fps)
+        names = sorted(n for n in os.listdir(path) if n.lower().endswith(_IMAGE_EXTENSIONS)) if os.path.isdir(path) else []
+        self._images: List[np.ndarray] = [
+            image for image in (cv2.imread(os.path.join(path, n)) for n in names) if image is not None
+        ]
+
+    def isOpened(self) -> bool:
+        return bool(self._images)
+
+    def read(self, image: Optional[np.ndarray] = None) -> Tuple[bool, np.ndarray]:
+        if not self._images:
+            return False, None
+        self._pace()
+        frame = self._images[self.frames % len(self._images)]
+        self.frames += 1
+        if image is None or image.shape != frame.shape:
+            return True, frame.copy()
+        np.copyto(image, frame)
+        return True, image
+
+
+class VideoFileSource(_PacedSource):
+    """A video file played in a loop at its own frame rate (or `fps` if given)."""
+
+    def __init__(self, path: str, fps: Optional[float] = None):
+        self._cap = cv2.VideoCapture(path)
+        super().__init__(fps or self._cap.get(cv2.CAP_PROP_FPS) or 30.0)
+
+    def isOpened(self) -> bool:
+        return self._cap.isOpened()
+
+    def read(self, image: Optional[np.ndarray] = None) -> Tuple[bool, np.ndarray]:
+        self._pace()
+        ret, frame = self._cap.read(image)
+        if not ret:
+            # End of file: rewind and carry on
+            self._cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            ret, frame = self._cap.read(image)
+        self.frames += ret
+        return ret, frame
+
+    def release(self):
+        self._cap.release()
+
+
+_SYNTHETIC = re.compile(r"^synthetic://(?:(\d+)x(\d+))?(?:@([\d.]+))?$")
+
+
+def open_frame_source(source):
+    """Open a capture source: one of the sources above by scheme, else cv2.VideoCapture."""
+    if isinstance(source, str):
+        match = _SYNTHETIC.match(source)
+        if match:
+            width, height, fps = match.groups()
+            return SyntheticSource(int(width or 640), int(height or 480), float(fps or 30))
+        if source.startswith("folder://"):
+            return FolderSource(source[len("folder://"):])
+        if source.startswith("video://"):
+            return VideoFileSource(source[len("video://"):])
+    return cv2.VideoCapture(source)
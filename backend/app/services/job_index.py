@@ -0,0 +1,120 @@
+import threading
+from bisect import bisect_left, bisect_right, insort
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+def _add(ids: List[int], job_id: int):
+    # Ids are allocated in increasing order, so this is nearly always an append
+    if not ids or ids[-1] < job_id:
+        ids.append(job_id)
+    else:
+        insort(ids, job_id)
+
+
+def _discard(ids: List[int], job_id: int):
+    i = bisect_left(ids, job_id)
+    if i < len(ids) and ids[i] == job_id:
+        del ids[i]
+
+
+class JobIndex:
+    """
+    Secondary indexes over print jobs for filtered, paginated listing.
+    Every index is a sorted list of job ids (printer, status, printer +
+    status, and all jobs), and job ids grow with created_at, so a page is
+    one bisect to the cursor plus `limit` steps whatever the history size.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._ids: List[int] = []
+        self._created: List[datetime] = []     # created_at, parallel to _ids
+        self._by_printer: Dict[int, List[int]] = {}
+        self._by_status: Dict[str, List[int]] = {}
+        self._by_printer_status: Dict[Tuple[int, str], List[int]] = {}
+        self._printer_of: Dict[int, int] = {}
+        self._status_of: Dict[int, str] = {}
+        # Moves after every change, so list caches can tell index updates apart
+        self.version = 0
+
+    def add(self, job: dict):
+        """Index a new job."""
+        job_id, printer_id, status = job["id"], job["printer_id"], job["status"]
+        with self._lock:
+            if job_id in self._status_of:
+                return
+            if not self._ids or self._ids[-1] < job_id:
+                self._ids.append(job_id)
+                self._created.append(job["created_at"])
+            else:
+                i = bisect_left(self._ids, job_id)
+                self._ids.insert(i, job_id)
+                self._created.insert(i, job["created_at"])
+            self._printer_of[job_id] = printer_id
+            self._status_of[job_id] = status
+            _add(self._by_printer.setdefault(printer_id, []), job_id)
+            _add(self._by_status.setdefault(status, []), job_id)
+            _add(self._by_printer_status.setdefault((printer_id, status), []), job_id)
+            self.version += 1
+
+    def set_status(self, job_id: int, status: str):
+        """Move a job to another status."""
+        with self._lock:
+            old = self._status_of.get(job_id)
+            if old is None or old == status:
+                return
+            printer_id = self._printer_of[job_id]
+            _discard(self._by_status[old], job_id)
+            _discard(self._by_printer_status[(printer_id, old)], job_id)
+            _add(self._by_status.setdefault(status, []), job_id)
+            _add(self._by_printer_status.setdefault((printer_id, status), []), job_id)
+            self._status_of[job_id] = status
+            self.version += 1
+
+    def rebuild(self, jobs: Iterable[dict]):
+        for job in jobs:
+            self.add(job)
+
+    def query(
+        self,
+        printer_id: Optional[int] = None,
+        status: Optional[str] = None,
+        created_after: Optional[datetime] = None,
+        created_before: Optional[datetime] = None,
+        after_id: int = 0,
+        limit: int = 100,
+    ) -> Tuple[List[int], Optional[int]]:
+        """
+        Ids of matching jobs (ascending) after after_id, at most limit of them,
+        and the cursor id for the next page (None on the last page).
+        """
+        with self._lock:
+            if printer_id is not None and status is not None:
+                ids = self._by_printer_status.get((printer_id, status), [])
+            elif printer_id is not None:
+                ids = self._by_printer.get(printer_id, [])
+            elif status is not None:
+                ids = self._by_status.get(status, [])
+            else:
+                ids = self._ids
+
+            # created_at ranges become id ranges (created_after is exclusive, created_before inclusive)
+            low, high = after_id, None
+            if created_after is not None:
+                i = bisect_right(self._created, created_after)
+                if i < len(self._ids):
+                    low = max(low, self._ids[i] - 1)
+                else:
+                    return [], None
+            if created_before is not None:
+                i = bisect_right(self._created, created_before)
+                if i == 0:
+                    return [], None
+                high = self._ids[i - 1]
+
+            start = bisect_right(ids, low)
+            end = len(ids) if high is None else bisect_right(ids, high)
+            page = ids[start:min(end, start + limit)]
+            more = start + limit < end
+        return page, (page[-1] if more and page else None)
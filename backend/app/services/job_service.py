@@ -1,17 +1,25 @@
+import threading
+import time
+from concurrent.futures import Future
 from datetime import datetime
-from typing import List, Optional
+from typing import Dict, Iterable, List, Optional, Tuple
+from app.core.config import settings
 from app.events.event_manager import event_manager
+from app.services.job_index import JobIndex
+from app.services.store import create_store
 
-# In-memory storage (later replaced by DB)
-PRINT_JOBS: List[dict] = []
-JOB_ID_SEQ = 1
+# In-memory or SQL storage, chosen by settings.STORAGE_BACKEND.
+# Progress reports are the hot write path, so they are committed in batches.
+PRINT_JOBS = create_store("print_jobs", buffered_fields=("progress",))
 
+# Secondary indexes for filtered listing, kept in step with every write below.
+# The SQL backend already holds jobs from earlier runs.
+JOB_INDEX = JobIndex()
+JOB_INDEX.rebuild(PRINT_JOBS.all())
 
-def create_job(printer_id: int, file_name: str, user_email: Optional[str]):
-    global JOB_ID_SEQ
 
-    job = {
-        "id": JOB_ID_SEQ,
+def create_job(printer_id: int, file_name: str, user_email: Optional[str], priority: int = 0):
+    job = PRINT_JOBS.insert({
         "printer_id": printer_id,
         "file_name": file_name,
         "status": "printing",
@@ -19,10 +27,9 @@ def create_job(printer_id: int, file_name: str, user_email: Optional[str]):
         "created_at": datetime.utcnow(),
         "finished_at": None,
         "user_email": user_email,
-    }
-
-    PRINT_JOBS.append(job)
-    JOB_ID_SEQ += 1
+        "priority": priority,
+    })
+    JOB_INDEX.add(job)
 
     # 🔔 Emit job_created event (AI will start here)
     event_manager.emit("job_created", job=job)
@@ -31,42 +38,197 @@ def create_job(printer_id: int, file_name: str, user_email: Optional[str]):
 
 
 def update_progress(job_id: int, progress: float):
-    for job in PRINT_JOBS:
-        if job["id"] == job_id:
-            job["progress"] = progress
+    fields = {"progress": progress}
+    if progress >= 100:
+        fields["status"] = "completed"
+        fields["finished_at"] = datetime.utcnow()
+
+    job = PRINT_JOBS.update(job_id, **fields)
+    if job is None:
+        return None
+    JOB_INDEX.set_status(job_id, job["status"])
+
+    if progress >= 100:
+        # 🔔 Emit job_finished event
+        event_manager.emit("job_finished", job=job)
+    else:
+        # Live progress for push clients; undelivered reports of a job collapse
+        event_manager.emit("job_progress", coalesce_key=job_id, job=job)
 
-            if progress >= 100:
-                job["status"] = "completed"
-                job["finished_at"] = datetime.utcnow()
+    return job
 
-                # 🔔 Emit job_finished event
-                event_manager.emit("job_finished", job=job)
 
-            return job
+def update_progress_many(updates: Dict[int, float]) -> dict:
+    """
+    Apply {job_id: progress} in one pass over the job store.
+    job_finished is emitted only for jobs that crossed 100 in this batch;
+    reports for jobs already at 100 just update their progress.
+    """
+    current = PRINT_JOBS.get_many(updates)
+    now = datetime.utcnow()
+    fields: Dict[int, dict] = {}
+    crossed = []
+    for job_id, job in current.items():
+        progress = updates[job_id]
+        fields[job_id] = {"progress": progress}
+        if progress >= 100 and (job["progress"] or 0) < 100:
+            fields[job_id].update(status="completed", finished_at=now)
+            crossed.append(job_id)
+
+    updated = PRINT_JOBS.update_many(fields)
+    for job_id in crossed:
+        if job_id in updated:
+            JOB_INDEX.set_status(job_id, "completed")
+
+    for job_id, job in updated.items():
+        if job_id in crossed:
+            # 🔔 Emit job_finished event
+            event_manager.emit("job_finished", job=job)
+        else:
+            event_manager.emit("job_progress", coalesce_key=job_id, job=job)
+
+    return {
+        "updated": updated,
+        "finished": [job_id for job_id in crossed if job_id in updated],
+        "not_found": [job_id for job_id in updates if job_id not in updated],
+    }
 
-    return None
 
+class ProgressCoalescer:
+    """
+    Group commit for bulk progress reports.
+    Updates submitted within window_ms of the first pending one are merged
+    (latest progress per job wins) and applied in a single
+    update_progress_many call; every submitter's future resolves to that
+    batch's result. With a window of 0 the worker takes the batch as soon
+    as it is free, so only submissions arriving during a commit are merged.
+    Store I/O always runs on the worker thread, never in the caller.
+    """
+
+    def __init__(self, window_ms: float):
+        self.window = window_ms / 1000
+        self._cond = threading.Condition()
+        self._pending: Dict[int, float] = {}
+        self._future: Optional[Future] = None
+        self._thread: Optional[threading.Thread] = None
+
+        # Stats
+        self.received = 0
+        self.coalesced = 0
+        self.batches = 0
+
+    def submit(self, updates: Iterable[Tuple[int, float]]) -> Future:
+        """Queue (job_id, progress) updates. The future resolves to the batch result."""
+        with self._cond:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+            for job_id, progress in updates:
+                self.received += 1
+                self.coalesced += job_id in self._pending
+                self._pending[job_id] = progress
+            if self._future is None:
+                self._future = Future()
+                self._cond.notify()
+            return self._future
+
+    def _run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._future is not None)
+            if self.window > 0:
+                # Let the window fill before taking the batch
+                time.sleep(self.window)
+            with self._cond:
+                pending, self._pending = self._pending, {}
+                future, self._future = self._future, None
+            self._apply(pending, future)
+
+    def _apply(self, pending: Dict[int, float], future: Future):
+        try:
+            result = update_progress_many(pending)
+            with self._cond:
+                self.batches += 1
+            future.set_result(result)
+        except Exception as e:
+            print(f"[JOBS] Error applying progress batch: {e}")
+            future.set_exception(e)
+
+    def stats(self) -> dict:
+        return {
+            "window_ms": 1000 * self.window,
+            "received": self.received,
+            "coalesced": self.coalesced,
+            "batches": self.batches,
+        }
+
+
+# Shared coalescer behind the bulk progress endpoint
+progress_coalescer = ProgressCoalescer(settings.PROGRESS_COALESCE_WINDOW_MS)
 
-def fail_job(job_id: int):
-    for job in PRINT_JOBS:
-        if job["id"] == job_id:
-            job["status"] = "failed"
-            job["finished_at"] = datetime.utcnow()
 
-            # 🔔 Emit job_failed event
-            event_manager.emit("job_failed", job=job)
+def fail_job(job_id: int):
+    job = PRINT_JOBS.update(job_id, status="failed", finished_at=datetime.utcnow())
+    if job is None:
+        return None
+    JOB_INDEX.set_status(job_id, "failed")
 
-            return job
+    # 🔔 Emit job_failed event
+    event_manager.emit("job_failed", job=job)
 
-    return None
+    return job
 
 
 def list_jobs():
-    return PRINT_JOBS
+    return PRINT_JOBS.all()
+
+
+def find_job_ids(
+    printer_id: Optional[int] = None,
+    status: Optional[str] = None,
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+    after_id: int = 0,
+    limit: int = 100,
+) -> Tuple[List[int], Optional[int]]:
+    """Ids of one page of jobs matching the filters, in id order, and the next page's cursor id."""
+    return JOB_INDEX.query(
+        printer_id=printer_id,
+        status=status,
+        created_after=created_after,
+        created_before=created_before,
+        after_id=after_id,
+        limit=limit,
+    )
+
+
+def get_jobs(job_ids: List[int]) -> List[dict]:
+    """Jobs by id, in the given order (unknown ids are skipped)."""
+    records = PRINT_JOBS.get_many(job_ids)
+    return [records[job_id] for job_id in job_ids if job_id in records]
+
+
+def jobs_version() -> int:
+    """
+    Change counter of the job listing: moves on every store write and again
+    once the index reflects it (the index is updated after the store).
+    """
+    return PRINT_JOBS.version + JOB_INDEX.version
 
 
 def get_job(job_id: int):
-    for job in PRINT_JOBS:
-        if job["id"] == job_id:
-            return job
-    return None
+    return PRINT_JOBS.get(job_id)
+
+
+def job_run_key(job: dict) -> str:
+    """
+    Name of a job's files on disk (detection history, recordings): its id
+    plus its creation time. Ids start again at 1 with the memory backend,
+    but those directories persist across restarts.
+    """
+    created_at = job.get("created_at")
+    if isinstance(created_at, datetime):
+        stamp = created_at.strftime("%Y%m%dT%H%M%S%f")
+    else:
+        stamp = "".join(c for c in str(created_at or "") if c.isalnum())
+    return f"job_{job['id']}_{stamp}"
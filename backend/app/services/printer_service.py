@@ -1,35 +1,33 @@
 from datetime import datetime
 from typing import List, Optional
+from app.events.event_manager import event_manager
+from app.services.store import create_store
 
-# Temporary in-memory storage (will be replaced by DB)
-PRINTERS = []
-PRINTER_ID_SEQ = 1
+# In-memory or SQL storage, chosen by settings.STORAGE_BACKEND
+PRINTERS = create_store("printers")
 
-def register_printer(name: str, location: str | None):
-    global PRINTER_ID_SEQ
-
-    printer = {
-        "id": PRINTER_ID_SEQ,
+def register_printer(name: str, location: str | None, camera_source: str | None = None):
+    printer = PRINTERS.insert({
         "name": name,
         "location": location,
         "status": "idle",
-        "created_at": datetime.utcnow()
-    }
-
-    PRINTERS.append(printer)
-    PRINTER_ID_SEQ += 1
-
+        "created_at": datetime.utcnow(),
+        "camera_source": camera_source,
+    })
+    event_manager.emit("printer_registered", printer=printer)
     return printer
 
 
 def list_printers() -> List[dict]:
     """Return all registered printers."""
-    return PRINTERS
+    return PRINTERS.all()
+
+
+def printers_version() -> int:
+    """Write counter of the printer store (moves on every change)."""
+    return PRINTERS.version
 
 
 def get_printer(printer_id: int) -> Optional[dict]:
     """Get a printer by ID. Returns None if not found."""
-    for printer in PRINTERS:
-        if printer["id"] == printer_id:
-            return printer
-    return None
+    return PRINTERS.get(printer_id)
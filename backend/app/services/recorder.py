@@ -0,0 +1,276 @@
+import multiprocessing
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from app.core.config import settings
+from app.services.camera_service import CameraService, camera_registry
+from app.services.job_service import job_run_key
+from app.services.recording_worker import run_encoder
+
+
+class JobRecording:
+    """
+    Samples one job's camera into the encoder's shared memory.
+    A sampler thread of its own reads the camera ring, so the capture and
+    inference loops never wait on recording: when every slot is still
+    with the encoder, the sample is simply dropped.
+    """
+
+    def __init__(self, recorder: "Recorder", job: dict, camera: CameraService, shape: tuple):
+        self.job_id = job["id"]
+        self.printer_id = job["printer_id"]
+        self._recorder = recorder
+        self._camera = camera
+        self.shape = shape
+        slots = max(2, settings.RECORD_SHM_SLOTS)
+        self._shm = shared_memory.SharedMemory(create=True, size=slots * int(np.prod(shape)))
+        self._frames = np.ndarray((slots, *shape), dtype=np.uint8, buffer=self._shm.buf)
+        self._free = deque(range(slots))
+        self._free_lock = threading.Lock()
+        self._stop_at: Optional[float] = None
+        self._clip_until = float("-inf")
+
+        # Stats
+        self.samples = 0
+        self.dropped = 0
+        self.incidents = 0
+
+        try:
+            recorder._send(("open", self.job_id, self._shm.name, shape, slots, job_run_key(job)))
+        except Exception:
+            self._shm.close()
+            self._shm.unlink()
+            raise
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def trigger(self, label: str):
+        """Record a clip around now: the buffered pre-trigger frames plus RECORD_POST_TRIGGER_S more."""
+        self.incidents += 1
+        self._clip_until = time.monotonic() + settings.RECORD_POST_TRIGGER_S
+        self._recorder._send(("trigger", self.job_id, label))
+
+    def stop(self, immediately: bool = False):
+        """Stop recording, once a clip in progress has its post-trigger frames."""
+        now = time.monotonic()
+        self._stop_at = now if immediately else max(now, self._clip_until)
+
+    def join(self, timeout: Optional[float] = None):
+        self._thread.join(timeout)
+
+    def free_slot(self, slot: int):
+        with self._free_lock:
+            self._free.append(slot)
+
+    def _run(self):
+        clip_interval = 1 / settings.RECORD_CLIP_FPS
+        timelapse_interval = settings.RECORD_TIMELAPSE_INTERVAL_S
+        next_clip = next_timelapse = time.monotonic()
+        last_seq = 0
+        try:
+            while self._stop_at is None or time.monotonic() < self._stop_at:
+                seq, frame = self._camera.wait_for_raw_frame(last_seq, 1.0)
+                if frame is None:
+                    continue
+                last_seq = seq
+
+                now = time.monotonic()
+                kinds = []
+                if now >= next_clip:
+                    kinds.append("clip")
+                    next_clip = max(next_clip + clip_interval, now)
+                if now >= next_timelapse:
+                    kinds.append("timelapse")
+                    next_timelapse = max(next_timelapse + timelapse_interval, now)
+                if not kinds:
+                    continue
+
+                with self._free_lock:
+                    slot = self._free.popleft() if self._free else None
+                if slot is None:
+                    self.dropped += 1
+                    continue
+                with self._camera.pinned_frame(seq) as frame:
+                    if frame is None or frame.shape != self.shape:
+                        self.free_slot(slot)
+                        continue
+                    self._frames[slot] = frame
+                self.samples += 1
+                self._recorder._send(("frame", self.job_id, slot, kinds))
+        finally:
+            self._recorder._send(("close", self.job_id))
+            camera_registry.release(self.printer_id)
+
+    def closed(self):
+        """Called once the encoder has detached from the shared memory."""
+        if self._frames is None:
+            return
+        self._frames = None
+        self._shm.close()
+        self._shm.unlink()
+
+    def stats(self) -> dict:
+        return {
+            "printer_id": self.printer_id,
+            "samples": self.samples,
+            "dropped": self.dropped,
+            "incidents": self.incidents,
+            "stopping": self._stop_at is not None,
+        }
+
+
+class Recorder:
+    """
+    Time-lapse and failure-clip recording of monitored jobs.
+    Frames go through shared memory to one encoder process (spawned on
+    first use) that writes RECORDINGS_DIR/<job_run_key>/ (so a reused job
+    id never inherits an earlier print's files) and evicts recordings
+    beyond RECORD_MAX_BYTES or older than RECORD_MAX_AGE_H.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._lock = threading.Lock()
+        self._process: Optional[multiprocessing.Process] = None
+        self._commands = None
+        self._results = None
+        self._recordings: Dict[int, JobRecording] = {}
+
+    def start(self, job: dict, camera: CameraService) -> Optional[JobRecording]:
+        """Start recording a job from its (acquired) camera. None if recording is off or fails."""
+        if not settings.RECORDING_ENABLED:
+            return None
+        _, frame = camera.ring.latest()
+        if frame is None:
+            return None
+        try:
+            with self._lock:
+                self._ensure_encoder()
+                if job["id"] in self._recordings:
+                    return self._recordings[job["id"]]
+                # The recording keeps its own camera reference, so post-trigger
+                # frames are still captured after the monitor lets go
+                if camera_registry.acquire(job["printer_id"]) is None:
+                    return None
+                try:
+                    recording = JobRecording(self, job, camera, frame.shape)
+                except Exception:
+                    camera_registry.release(job["printer_id"])
+                    raise
+                self._recordings[job["id"]] = recording
+            return recording
+        except Exception as e:
+            print(f"[REC] Could not start recording job {job['id']}: {e}")
+            return None
+
+    def trigger(self, job_id: int, label: str):
+        recording = self._recordings.get(job_id)
+        if recording is not None:
+            recording.trigger(label)
+
+    def stop(self, job_id: int):
+        recording = self._recordings.get(job_id)
+        if recording is not None:
+            recording.stop()
+
+    def list_recordings(self, job: dict) -> List[dict]:
+        """Recording files of a job, oldest first."""
+        directory = os.path.join(self.directory, job_run_key(job))
+        try:
+            names = os.listdir(directory)
+        except OSError:
+            return []
+        files = []
+        for name in names:
+            try:
+                stat = os.stat(os.path.join(directory, name))
+            except OSError:
+                continue
+            files.append({
+                "name": name,
+                "kind": "timelapse" if name.startswith("timelapse") else "incident",
+                "bytes": stat.st_size,
+                "modified_at": datetime.utcfromtimestamp(stat.st_mtime),
+                "recording": job["id"] in self._recordings,
+            })
+        return sorted(files, key=lambda f: f["modified_at"])
+
+    def recording_path(self, job: dict, name: str) -> Optional[str]:
+        """Path of one of a job's recordings (None if it doesn't exist)."""
+        if name not in {f["name"] for f in self.list_recordings(job)}:
+            return None
+        return os.path.join(self.directory, job_run_key(job), name)
+
+    def stats(self) -> dict:
+        return {
+            "enabled": settings.RECORDING_ENABLED,
+            "encoder_alive": self._process is not None and self._process.is_alive(),
+            "jobs": {job_id: r.stats() for job_id, r in list(self._recordings.items())},
+        }
+
+    def _send(self, command: tuple):
+        self._commands.put(command)
+
+    def _ensure_encoder(self):
+        """Start the encoder process if it isn't running. Caller holds the lock."""
+        if self._process is not None and self._process.is_alive():
+            return
+        # spawn: forking a process that runs threads (cameras, monitors) is unsafe
+        context = multiprocessing.get_context("spawn")
+        self._commands = context.Queue()
+        self._results = context.Queue()
+        options = {
+            "directory": self.directory,
+            "timelapse_fps": settings.RECORD_TIMELAPSE_FPS,
+            "clip_fps": settings.RECORD_CLIP_FPS,
+            "pre_trigger_s": settings.RECORD_PRE_TRIGGER_S,
+            "post_trigger_s": settings.RECORD_POST_TRIGGER_S,
+            "max_bytes": settings.RECORD_MAX_BYTES,
+            "max_age_s": settings.RECORD_MAX_AGE_H * 3600,
+            "evict_interval_s": settings.RECORD_EVICT_INTERVAL_S,
+        }
+        self._process = context.Process(
+            target=run_encoder, args=(self._commands, self._results, options), name="recorder", daemon=True
+        )
+        self._process.start()
+        threading.Thread(target=self._handle_results, args=(self._results,), daemon=True).start()
+        print(f"[REC] Encoder process started (pid {self._process.pid})")
+
+    def _handle_results(self, results):
+        while True:
+            message = results.get()
+            kind, job_id = message[0], message[1]
+            recording = self._recordings.get(job_id)
+            if recording is None:
+                continue
+            if kind == "free":
+                recording.free_slot(message[2])
+            elif kind == "closed":
+                with self._lock:
+                    self._recordings.pop(job_id, None)
+                recording.closed()
+
+    def shutdown(self):
+        """Finish open recordings and stop the encoder."""
+        with self._lock:
+            process = self._process
+            recordings = list(self._recordings.values())
+        for recording in recordings:
+            recording.stop(immediately=True)
+            recording.join(timeout=2.0)
+        if process is not None and process.is_alive():
+            self._send(None)
+            process.join(timeout=5.0)
+        for recording in recordings:
+            recording.closed()
+
+
+# Global recorder used by the AI monitors
+recorder = Recorder(settings.RECORDINGS_DIR)
@@ -0,0 +1,185 @@
+"""
+Encoder process of the recorder.
+Runs apart from the API process: frames arrive in shared memory slots
+announced over a command queue, and every slot is handed back as soon as
+it has been read. Nothing here touches the app's settings or stores.
+"""
+import os
+import time
+from collections import deque
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional, Set
+
+import cv2
+import numpy as np
+
+_FOURCC = cv2.VideoWriter_fourcc(*"mp4v")
+
+
+class _JobState:
+    """Open writers and the pre-trigger buffer of one job."""
+
+    def __init__(self, job_id: int, shm_name: str, shape: tuple, slots: int, directory: str, options: dict):
+        self.job_id = job_id
+        self.shm = shared_memory.SharedMemory(name=shm_name)
+        self.frames = np.ndarray((slots, *shape), dtype=np.uint8, buffer=self.shm.buf)
+        self.size = (shape[1], shape[0])
+        self.directory = directory
+        self.options = options
+        os.makedirs(directory, exist_ok=True)
+
+        self.timelapse: Optional[cv2.VideoWriter] = None
+        # Last RECORD_PRE_TRIGGER_S of clip-rate frames, JPEG-compressed
+        self.pre = deque(maxlen=max(1, int(options["pre_trigger_s"] * options["clip_fps"])))
+        self.clip: Optional[cv2.VideoWriter] = None
+        self.clip_path: Optional[str] = None
+        self.clip_left = 0
+        self.incidents = 0
+
+    def open_paths(self) -> Set[str]:
+        paths = {self.clip_path} if self.clip is not None else set()
+        if self.timelapse is not None:
+            paths.add(self._timelapse_path())
+        return paths
+
+    def _timelapse_path(self) -> str:
+        return os.path.join(self.directory, "timelapse.mp4")
+
+    def add_frame(self, slot: int, kinds: List[str]) -> bool:
+        """Write the frame where it's wanted. Returns True if it finished a clip."""
+        frame = self.frames[slot]
+        if "timelapse" in kinds:
+            if self.timelapse is None:
+                self.timelapse = cv2.VideoWriter(self._timelapse_path(), _FOURCC, self.options["timelapse_fps"], self.size)
+            self.timelapse.write(frame)
+        if "clip" in kinds:
+            ok, jpeg = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, 80])
+            if ok:
+                self.pre.append(jpeg)
+            if self.clip is not None:
+                self.clip.write(frame)
+                self.clip_left -= 1
+                if self.clip_left <= 0:
+                    self.finish_clip()
+                    return True
+        return False
+
+    def trigger(self, label: str):
+        post_frames = max(1, int(self.options["post_trigger_s"] * self.options["clip_fps"]))
+        if self.clip is not None:
+            # Another failure during a clip extends it
+            self.clip_left = post_frames
+            return
+        self.incidents += 1
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        self.clip_path = os.path.join(self.directory, f"incident_{self.incidents}_{stamp}_{label}.mp4")
+        self.clip = cv2.VideoWriter(self.clip_path, _FOURCC, self.options["clip_fps"], self.size)
+        for jpeg in self.pre:
+            self.clip.write(cv2.imdecode(jpeg, cv2.IMREAD_COLOR))
+        self.clip_left = post_frames
+
+    def finish_clip(self):
+        if self.clip is not None:
+            self.clip.release()
+            self.clip = None
+            self.clip_left = 0
+
+    def close(self):
+        self.finish_clip()
+        if self.timelapse is not None:
+            self.timelapse.release()
+            self.timelapse = None
+        # Drop the array view before closing, or the mapping stays exported
+        self.frames = None
+        self.shm.close()
+
+
+def evict(root: str, max_bytes: int, max_age_s: float, keep: Set[str] = frozenset()) -> int:
+    """Delete recordings older than max_age_s, then the oldest until under max_bytes. Returns files removed."""
+    files = []
+    for directory, _, names in os.walk(root):
+        for name in names:
+            path = os.path.join(directory, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+
+    now = time.time()
+    total = sum(size for _, size, _ in files)
+    removed = 0
+    for mtime, size, path in sorted(files):
+        if path in keep:
+            continue
+        if now - mtime <= max_age_s and total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+        except OSError:
+            continue
+        total -= size
+        removed += 1
+        try:
+            os.rmdir(os.path.dirname(path))
+        except OSError:
+            pass  # directory still has recordings
+    return removed
+
+
+def run_encoder(commands, results, options: dict):
+    """
+    Process entry point. Commands:
+    ("open", job_id, shm_name, shape, slots, dirname), ("frame", job_id, slot, kinds),
+    ("trigger", job_id, label), ("close", job_id), and None to exit.
+    """
+    jobs: Dict[int, _JobState] = {}
+    root = options["directory"]
+
+    last_evict = time.monotonic()
+
+    def enforce_limits(force: bool = True):
+        # Files still being written are kept; everything else counts
+        nonlocal last_evict
+        now = time.monotonic()
+        if force or now - last_evict >= options["evict_interval_s"]:
+            last_evict = now
+            open_paths = set().union(*(state.open_paths() for state in jobs.values())) if jobs else set()
+            evict(root, options["max_bytes"], options["max_age_s"], keep=open_paths)
+
+    while True:
+        command = commands.get()
+        if command is None:
+            break
+        kind, job_id = command[0], command[1]
+        try:
+            if kind == "open":
+                _, _, shm_name, shape, slots, dirname = command
+                jobs[job_id] = _JobState(job_id, shm_name, shape, slots, os.path.join(root, dirname), options)
+                enforce_limits()
+            elif kind == "frame":
+                _, _, slot, kinds = command
+                finished_clip = False
+                try:
+                    state = jobs.get(job_id)
+                    if state is not None:
+                        finished_clip = state.add_frame(slot, kinds)
+                finally:
+                    results.put(("free", job_id, slot))
+                # Long prints keep writing clips and time-lapse frames
+                enforce_limits(force=finished_clip)
+            elif kind == "trigger":
+                state = jobs.get(job_id)
+                if state is not None:
+                    state.trigger(command[2])
+            elif kind == "close":
+                state = jobs.pop(job_id, None)
+                if state is not None:
+                    state.close()
+                results.put(("closed", job_id))
+                enforce_limits()
+        except Exception as e:
+            print(f"[REC] Encoder error on {kind} for job {job_id}: {e}")
+
+    for state in jobs.values():
+        state.close()
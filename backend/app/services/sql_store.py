@@ -0,0 +1,316 @@
+import atexit
+import threading
+import time
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import (
+    Column, DateTime, Float, Integer, MetaData, String, Table,
+    bindparam, create_engine, event, func, select,
+)
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.pool import StaticPool
+
+from app.core.config import settings
+
+metadata = MetaData()
+
+TABLES: Dict[str, Table] = {
+    "print_jobs": Table(
+        "print_jobs", metadata,
+        Column("id", Integer, primary_key=True, autoincrement=True),
+        Column("printer_id", Integer, nullable=False, index=True),
+        Column("file_name", String, nullable=False),
+        Column("status", String, nullable=False, index=True),
+        Column("progress", Float, nullable=False, default=0.0),
+        Column("created_at", DateTime, nullable=False),
+        Column("finished_at", DateTime, nullable=True),
+        Column("user_email", String, nullable=True),
+        Column("priority", Integer, nullable=False, default=0),
+    ),
+    "printers": Table(
+        "printers", metadata,
+        Column("id", Integer, primary_key=True, autoincrement=True),
+        Column("name", String, nullable=False),
+        Column("location", String, nullable=True),
+        Column("status", String, nullable=False),
+        Column("created_at", DateTime, nullable=False),
+        Column("camera_source", String, nullable=True),
+    ),
+    "users": Table(
+        "users", metadata,
+        Column("id", Integer, primary_key=True, autoincrement=True),
+        Column("email", String, nullable=False, unique=True, index=True),
+        Column("hashed_password", String, nullable=False),
+        Column("created_at", DateTime, nullable=False),
+    ),
+}
+
+_engine: Optional[Engine] = None
+_engine_lock = threading.Lock()
+
+
+def get_engine() -> Engine:
+    """Lazily create the pooled engine and the schema."""
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            url = settings.DATABASE_URL
+            connect_args = {}
+            pool_args = {"pool_size": settings.DB_POOL_SIZE, "max_overflow": settings.DB_MAX_OVERFLOW}
+            if url.startswith("sqlite"):
+                # Pooled connections are shared across request/monitor threads
+                connect_args["check_same_thread"] = False
+                if url in ("sqlite://", "sqlite:///:memory:") or "mode=memory" in url:
+                    # Each connection would get its own empty in-memory
+                    # database, so every thread shares a single one
+                    pool_args = {"poolclass": StaticPool}
+
+            engine = create_engine(
+                url,
+                pool_pre_ping=True,
+                connect_args=connect_args,
+                **pool_args,
+            )
+
+            if url.startswith("sqlite"):
+                @event.listens_for(engine, "connect")
+                def _sqlite_pragmas(dbapi_connection, connection_record):
+                    # WAL lets readers proceed during a commit, and NORMAL
+                    # sync only fsyncs at checkpoints instead of every commit
+                    cursor = dbapi_connection.cursor()
+                    cursor.execute("PRAGMA journal_mode=WAL")
+                    cursor.execute("PRAGMA synchronous=NORMAL")
+                    cursor.close()
+
+            metadata.create_all(engine)
+            _engine = engine
+            print(f"[DB] Connected to {engine.url.render_as_string(hide_password=True)}")
+    return _engine
+
+
+class SqlStore:
+    """
+    SQLAlchemy-backed store with the same interface as IndexedStore.
+    Updates that only touch buffered fields (e.g. job progress) are
+    coalesced per record and committed in one executemany every
+    DB_COMMIT_INTERVAL_MS; reads overlay the pending values.
+    """
+
+    def __init__(
+        self,
+        table: str,
+        unique_fields: Iterable[str] = (),
+        buffered_fields: Iterable[str] = (),
+    ):
+        self.table = TABLES[table]
+        self.engine = get_engine()
+        self._unique = set(unique_fields)
+        self._buffered = set(buffered_fields)
+
+        # Statements are built once so SQLAlchemy's compiled cache is hit
+        self._insert_stmt = self.table.insert()
+        self._insert_many_stmt = self.table.insert().returning(
+            self.table.c.id, sort_by_parameter_order=True
+        )
+        self._get_stmt = select(self.table).where(self.table.c.id == bindparam("_id"))
+        self._get_many_stmt = select(self.table).where(
+            self.table.c.id.in_(bindparam("_ids", expanding=True))
+        )
+        self._all_stmt = select(self.table).order_by(self.table.c.id)
+        self._count_stmt = select(func.count()).select_from(self.table)
+
+        # Updates waiting for the next commit, and the batch being committed
+        self._pending: Dict[int, dict] = {}
+        self._inflight: Dict[int, dict] = {}
+        self._pending_lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._flusher_lock = threading.Lock()
+        self._flusher: Optional[threading.Thread] = None
+        atexit.register(self.flush)
+
+        # Bumped on every write through this store (writes by other
+        # processes are not seen); lets readers cache derived views
+        self.version = 0
+        self._version_lock = threading.Lock()
+
+    def _bump_version(self):
+        with self._version_lock:
+            self.version += 1
+
+    def _overlay(self, record: dict) -> dict:
+        for buffer in (self._inflight, self._pending):
+            fields = buffer.get(record["id"])
+            if fields:
+                record.update(fields)
+        return record
+
+    def insert(self, record: dict) -> dict:
+        """Insert a record and return it with its new id."""
+        self._check_unique(record)
+        try:
+            with self.engine.begin() as conn:
+                result = conn.execute(self._insert_stmt, record)
+                record_id = result.inserted_primary_key[0]
+        except IntegrityError as e:
+            # Lost a race with a concurrent insert after the check
+            self._raise_duplicate(e, [record])
+            raise
+        self._bump_version()
+        return {"id": record_id, **record}
+
+    def insert_many(self, records: List[dict]) -> List[dict]:
+        """Insert several records with one batched statement."""
+        if not records:
+            return []
+        for record in records:
+            self._check_unique(record)
+        try:
+            with self.engine.begin() as conn:
+                ids = conn.execute(self._insert_many_stmt, records).scalars().all()
+        except IntegrityError as e:
+            self._raise_duplicate(e, records)
+            raise
+        self._bump_version()
+        return [{"id": record_id, **record} for record_id, record in zip(ids, records)]
+
+    def _check_unique(self, record: dict):
+        for field in self._unique:
+            value = record.get(field)
+            if value is not None and self.get_by(field, value) is not None:
+                raise ValueError(f"Duplicate {field}: {value}")
+
+    def _raise_duplicate(self, error: IntegrityError, records: List[dict]):
+        """
+        Turn a unique constraint violation into the ValueError the check
+        raises, so callers see the same error as with IndexedStore. The
+        database names the violated column in its message.
+        """
+        message = str(error.orig)
+        for field in self._unique:
+            values = [record[field] for record in records if record.get(field) is not None]
+            if values and field in message:
+                existing = [value for value in values if self.get_by(field, value) is not None]
+                value = existing[0] if existing else next((v for v in values if values.count(v) > 1), values[0])
+                raise ValueError(f"Duplicate {field}: {value}")
+
+    def get(self, record_id: int) -> Optional[dict]:
+        """Get a record by id. Returns None if not found."""
+        with self.engine.connect() as conn:
+            row = conn.execute(self._get_stmt, {"_id": record_id}).first()
+        if row is None:
+            return None
+        return self._overlay(dict(row._mapping))
+
+    def get_many(self, record_ids: Iterable[int]) -> Dict[int, dict]:
+        """Records by id for the ids that exist, in one query."""
+        record_ids = list(record_ids)
+        if not record_ids:
+            return {}
+        with self.engine.connect() as conn:
+            rows = conn.execute(self._get_many_stmt, {"_ids": record_ids}).all()
+        return {row.id: self._overlay(dict(row._mapping)) for row in rows}
+
+    def get_by(self, field: str, value) -> Optional[dict]:
+        """Get a record through a unique (indexed) column."""
+        stmt = select(self.table).where(self.table.c[field] == value)
+        with self.engine.connect() as conn:
+            row = conn.execute(stmt).first()
+        if row is None:
+            return None
+        return self._overlay(dict(row._mapping))
+
+    def update(self, record_id: int, **fields) -> Optional[dict]:
+        """Update a record. Buffered-only updates are committed in the background."""
+        record = self.get(record_id)
+        if record is None:
+            return None
+
+        with self._pending_lock:
+            self._pending.setdefault(record_id, {}).update(fields)
+        record.update(fields)
+        self._bump_version()
+
+        if set(fields) <= self._buffered:
+            self._ensure_flusher()
+        else:
+            # State transitions are committed before returning
+            self.flush()
+        return record
+
+    def update_many(self, updates: Dict[int, dict]) -> Dict[int, dict]:
+        """Apply {id: fields} with one read and at most one commit. Unknown ids are skipped."""
+        records = self.get_many(updates)
+        if not records:
+            return {}
+
+        with self._pending_lock:
+            for record_id, record in records.items():
+                self._pending.setdefault(record_id, {}).update(updates[record_id])
+                record.update(updates[record_id])
+        self._bump_version()
+
+        if all(set(updates[record_id]) <= self._buffered for record_id in records):
+            self._ensure_flusher()
+        else:
+            self.flush()
+        return records
+
+    def all(self) -> List[dict]:
+        """All records in id order."""
+        with self.engine.connect() as conn:
+            rows = conn.execute(self._all_stmt).all()
+        return [self._overlay(dict(row._mapping)) for row in rows]
+
+    def __len__(self) -> int:
+        with self.engine.connect() as conn:
+            return conn.execute(self._count_stmt).scalar_one()
+
+    def _ensure_flusher(self):
+        if self._flusher is None:
+            with self._flusher_lock:
+                if self._flusher is None:
+                    self._flusher = threading.Thread(target=self._flush_loop, daemon=True)
+                    self._flusher.start()
+
+    def _flush_loop(self):
+        interval = settings.DB_COMMIT_INTERVAL_MS / 1000
+        while True:
+            time.sleep(interval)
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"[DB] Error flushing {self.table.name}: {e}")
+
+    def flush(self):
+        """Commit all pending updates in a single transaction."""
+        with self._flush_lock:
+            with self._pending_lock:
+                if not self._pending:
+                    return
+                pending, self._pending = self._pending, {}
+                self._inflight = pending
+
+            # Group rows by the set of columns they touch so each group is
+            # one prepared UPDATE run with executemany
+            groups: Dict[tuple, List[dict]] = {}
+            for record_id, fields in pending.items():
+                groups.setdefault(tuple(sorted(fields)), []).append({"_id": record_id, **fields})
+
+            try:
+                with self.engine.begin() as conn:
+                    for columns, rows in groups.items():
+                        stmt = (
+                            self.table.update()
+                            .where(self.table.c.id == bindparam("_id"))
+                            .values({c: bindparam(c) for c in columns})
+                        )
+                        conn.execute(stmt, rows)
+            except Exception:
+                # Put the batch back (newer pending values win) and retry later
+                with self._pending_lock:
+                    for record_id, fields in pending.items():
+                        self._pending[record_id] = {**fields, **self._pending.get(record_id, {})}
+                raise
+            finally:
+                self._inflight = {}
@@ -0,0 +1,115 @@
+import threading
+from typing import Dict, Iterable, List, Optional
+from app.core.config import settings
+
+
+class IndexedStore:
+    """
+    Thread-safe in-memory record store with O(1) lookups.
+    Records are plain dicts keyed by their "id"; unique fields (e.g. a
+    user's email) get their own hash index so lookups never scan the store.
+    """
+
+    def __init__(self, unique_fields: Iterable[str] = ()):
+        # Guards id allocation, index maintenance and record mutation.
+        # Point reads go straight to the dicts (atomic under the GIL).
+        self._lock = threading.RLock()
+        self._records: Dict[int, dict] = {}
+        self._unique: Dict[str, Dict[object, int]] = {f: {} for f in unique_fields}
+        self._next_id = 1
+        # Bumped on every write; lets readers cache derived views of the store
+        self.version = 0
+
+    def insert(self, record: dict) -> dict:
+        """Assign the next id to a record and store it."""
+        with self._lock:
+            for field, index in self._unique.items():
+                value = record.get(field)
+                if value is not None and value in index:
+                    raise ValueError(f"Duplicate {field}: {value}")
+
+            record = {"id": self._next_id, **record}
+            self._next_id += 1
+            self._records[record["id"]] = record
+            self.version += 1
+
+            for field, index in self._unique.items():
+                value = record.get(field)
+                if value is not None:
+                    index[value] = record["id"]
+
+        return record
+
+    def insert_many(self, records: List[dict]) -> List[dict]:
+        """Insert several records under a single lock acquisition."""
+        with self._lock:
+            return [self.insert(record) for record in records]
+
+    def get(self, record_id: int) -> Optional[dict]:
+        """Get a record by id. Returns None if not found."""
+        return self._records.get(record_id)
+
+    def get_many(self, record_ids: Iterable[int]) -> Dict[int, dict]:
+        """Records by id for the ids that exist."""
+        records = self._records
+        return {record_id: records[record_id] for record_id in record_ids if record_id in records}
+
+    def get_by(self, field: str, value) -> Optional[dict]:
+        """Get a record through a unique index. Returns None if not found."""
+        record_id = self._unique[field].get(value)
+        if record_id is None:
+            return None
+        return self._records.get(record_id)
+
+    def update(self, record_id: int, **fields) -> Optional[dict]:
+        """Update fields of a record in place. Returns None if not found."""
+        with self._lock:
+            record = self._records.get(record_id)
+            if record is None:
+                return None
+
+            for field, index in self._unique.items():
+                if field in fields and fields[field] != record.get(field):
+                    if fields[field] in index:
+                        raise ValueError(f"Duplicate {field}: {fields[field]}")
+                    index.pop(record.get(field), None)
+                    index[fields[field]] = record_id
+
+            record.update(fields)
+            self.version += 1
+            return record
+
+    def update_many(self, updates: Dict[int, dict]) -> Dict[int, dict]:
+        """Apply {id: fields} under a single lock acquisition. Unknown ids are skipped."""
+        with self._lock:
+            updated = {}
+            for record_id, fields in updates.items():
+                record = self.update(record_id, **fields)
+                if record is not None:
+                    updated[record_id] = record
+            return updated
+
+    def all(self) -> List[dict]:
+        """Snapshot of all records in insertion (id) order."""
+        with self._lock:
+            return list(self._records.values())
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+
+def create_store(
+    table: str,
+    unique_fields: Iterable[str] = (),
+    buffered_fields: Iterable[str] = (),
+):
+    """
+    Create the store backing a table, using settings.STORAGE_BACKEND.
+    buffered_fields only matter for the SQL backend, where updates that
+    touch nothing else are committed in batches instead of one by one.
+    """
+    if settings.STORAGE_BACKEND == "sql":
+        # Imported lazily so the in-memory backend doesn't need SQLAlchemy
+        from app.services.sql_store import SqlStore
+        return SqlStore(table, unique_fields=unique_fields, buffered_fields=buffered_fields)
+    return IndexedStore(unique_fields=unique_fields)
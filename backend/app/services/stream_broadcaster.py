@@ -0,0 +1,135 @@
+import threading
+import time
+import cv2
+from typing import Callable, Optional, Set, Tuple
+from app.core.config import settings
+from app.core.metrics import CAMERA_STAGE_SECONDS
+
+
+class FrameBroadcaster:
+    """
+    Per-camera JPEG fan-out for stream clients.
+    While at least one client is subscribed, a single encoder thread waits
+    for new camera frames, encodes each one exactly once (capped at
+    STREAM_MAX_FPS) and publishes the bytes. Clients always pick up the
+    latest encoded frame, so slow clients skip frames instead of queueing.
+    Async clients pass a notify callback to subscribe() instead of
+    blocking in wait_next(), so they hold no thread while idle.
+    """
+
+    def __init__(self, camera):
+        self.camera = camera
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._notifiers: Set[Callable[[], None]] = set()
+        self.subscribers = 0
+
+        # Latest encoded frame, tagged with the camera seq it came from
+        self._jpeg: Optional[bytes] = None
+        self._jpeg_seq = 0
+        self.frames_encoded = 0
+
+    def subscribe(self, notify: Optional[Callable[[], None]] = None):
+        """
+        Register a stream client and make sure the encoder is running.
+        notify, if given, is called from the encoder thread after each new
+        frame; it must be cheap and thread-safe (e.g. loop.call_soon_threadsafe).
+        """
+        with self._cond:
+            self.subscribers += 1
+            if notify is not None:
+                self._notifiers.add(notify)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+
+    def unsubscribe(self, notify: Optional[Callable[[], None]] = None):
+        """Remove a stream client. The encoder stops with the last one."""
+        with self._cond:
+            self.subscribers = max(0, self.subscribers - 1)
+            self._notifiers.discard(notify)
+            self._cond.notify_all()
+
+    def latest(self, after_seq: int) -> Tuple[int, Optional[bytes]]:
+        """Non-blocking wait_next(): the latest frame if newer than after_seq."""
+        with self._cond:
+            if self._jpeg_seq > after_seq:
+                return self._jpeg_seq, self._jpeg
+        return after_seq, None
+
+    def wait_next(self, after_seq: int, timeout: Optional[float] = None) -> Tuple[int, Optional[bytes]]:
+        """Wait for an encoded frame newer than after_seq. Returns (seq, jpeg) or (after_seq, None)."""
+        with self._cond:
+            self._cond.wait_for(lambda: self._jpeg_seq > after_seq, timeout)
+            if self._jpeg_seq > after_seq:
+                return self._jpeg_seq, self._jpeg
+        return after_seq, None
+
+    def snapshot(self) -> Optional[bytes]:
+        """JPEG of the camera's current frame, reusing the stream encoding when it is current."""
+        if not self.camera.is_running:
+            return None
+        seq, frame = self.camera.ring.latest()
+        if frame is None:
+            return None
+        return self._encode(seq, frame)
+
+    def _encode(self, seq: int, frame) -> Optional[bytes]:
+        with self._cond:
+            if seq == self._jpeg_seq and self._jpeg is not None:
+                return self._jpeg
+
+        # Detections are drawn here, so once per frame however many viewers
+        # there are, and never for frames nobody watches
+        label = str(self.camera.camera_index)
+        start = time.perf_counter()
+        rendered = self.camera.render(frame)
+        encode_start = time.perf_counter()
+        if rendered is not frame:
+            CAMERA_STAGE_SECONDS.observe(encode_start - start, camera=label, stage="annotate")
+        ret, buffer = cv2.imencode('.jpg', rendered, [cv2.IMWRITE_JPEG_QUALITY, settings.STREAM_JPEG_QUALITY])
+        CAMERA_STAGE_SECONDS.observe(time.perf_counter() - encode_start, camera=label, stage="encode")
+        if not ret:
+            return None
+        jpeg = buffer.tobytes()
+
+        with self._cond:
+            if seq > self._jpeg_seq:
+                self._jpeg, self._jpeg_seq = jpeg, seq
+                self.frames_encoded += 1
+                self._cond.notify_all()
+                notifiers = list(self._notifiers)
+            else:
+                notifiers = []
+
+        for notify in notifiers:
+            try:
+                notify()
+            except RuntimeError:
+                # The client's event loop is closed; it will unsubscribe itself
+                pass
+        return jpeg
+
+    def _run(self):
+        min_interval = 1.0 / settings.STREAM_MAX_FPS if settings.STREAM_MAX_FPS > 0 else 0.0
+        last_seq = 0
+        while True:
+            with self._cond:
+                if self.subscribers == 0:
+                    self._thread = None
+                    return
+
+            started = time.monotonic()
+            seq, frame = self.camera.wait_for_frame(last_seq, timeout=1.0)
+            if frame is None:
+                if not self.camera.is_available():
+                    time.sleep(0.1)
+                continue
+
+            last_seq = seq
+            self._encode(seq, frame)
+
+            # Cap the stream rate; frames arriving meanwhile are simply skipped
+            elapsed = time.monotonic() - started
+            if elapsed < min_interval:
+                time.sleep(min_interval - elapsed)
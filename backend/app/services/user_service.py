@@ -1,14 +1,12 @@
 from datetime import datetime
-from typing import List, Optional
-from passlib.context import CryptContext
-
-# In-memory storage (like printers/jobs)
-USERS: List[dict] = []
-USER_ID_SEQ = 1
-
-# Password hashing context
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from typing import Optional
+from fastapi.concurrency import run_in_threadpool
+from app.core.password_hasher import password_hasher, pwd_context
+from app.core.token_cache import token_cache
+from app.services.store import create_store
 
+# In-memory or SQL storage (like printers/jobs)
+USERS = create_store("users", unique_fields=("email",))
 
 def hash_password(password: str) -> str:
     """Hash a password using bcrypt."""
@@ -22,22 +20,40 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 
 def create_user(email: str, password: str) -> dict:
     """Create a new user with hashed password."""
-    global USER_ID_SEQ
-    
     # Check if user already exists
     if get_user_by_email(email):
         raise ValueError(f"User with email {email} already exists")
     
-    user = {
-        "id": USER_ID_SEQ,
-        "email": email,
-        "hashed_password": hash_password(password),
-        "created_at": datetime.utcnow()
-    }
-    
-    USERS.append(user)
-    USER_ID_SEQ += 1
+    return _insert_user(email, hash_password(password))
+
+
+async def create_user_async(email: str, password: str) -> dict:
+    """create_user with bcrypt on the password hashing pool (may raise PasswordHasherBusy)."""
+    if await run_in_threadpool(get_user_by_email, email):
+        raise ValueError(f"User with email {email} already exists")
     
+    hashed_password = await password_hasher.hash(password)
+    return await run_in_threadpool(_insert_user, email, hashed_password)
+
+
+def _insert_user(email: str, hashed_password: str) -> dict:
+    try:
+        return USERS.insert({
+            "email": email,
+            "hashed_password": hashed_password,
+            "created_at": datetime.utcnow()
+        })
+    except ValueError:
+        # Lost a race with a concurrent signup for the same email
+        raise ValueError(f"User with email {email} already exists")
+
+
+def update_user(user_id: int, **fields) -> Optional[dict]:
+    """Update a user's fields. Cached tokens of the user are dropped."""
+    if "password" in fields:
+        fields["hashed_password"] = hash_password(fields.pop("password"))
+    user = USERS.update(user_id, **fields)
+    token_cache.invalidate_user(user_id)
     return user
 
 
@@ -47,9 +63,28 @@ def authenticate_user(email: str, password: str) -> Optional[dict]:
     if not user:
         return None
     
-    if not verify_password(password, user["hashed_password"]):
+    valid, new_hash = pwd_context.verify_and_update(password, user["hashed_password"])
+    return _authenticated(user, valid, new_hash)
+
+
+async def authenticate_user_async(email: str, password: str) -> Optional[dict]:
+    """authenticate_user with bcrypt on the password hashing pool (may raise PasswordHasherBusy)."""
+    user = await run_in_threadpool(get_user_by_email, email)
+    if not user:
         return None
     
+    valid, new_hash = await password_hasher.verify_and_update(password, user["hashed_password"])
+    return await run_in_threadpool(_authenticated, user, valid, new_hash)
+
+
+def _authenticated(user: dict, valid: bool, new_hash: Optional[str]) -> Optional[dict]:
+    if not valid:
+        return None
+    
+    if new_hash:
+        # Stored hash used another bcrypt cost: upgrade it while we have the password
+        USERS.update(user["id"], hashed_password=new_hash)
+    
     # Return user without password hash
     return {
         "id": user["id"],
@@ -60,19 +95,16 @@ def authenticate_user(email: str, password: str) -> Optional[dict]:
 
 def get_user_by_email(email: str) -> Optional[dict]:
     """Get a user by email."""
-    for user in USERS:
-        if user["email"] == email:
-            return user
-    return None
+    return USERS.get_by("email", email)
 
 
 def get_user_by_id(user_id: int) -> Optional[dict]:
     """Get a user by ID."""
-    for user in USERS:
-        if user["id"] == user_id:
-            return {
-                "id": user["id"],
-                "email": user["email"],
-                "created_at": user["created_at"]
-            }
-    return None
+    user = USERS.get(user_id)
+    if user is None:
+        return None
+    return {
+        "id": user["id"],
+        "email": user["email"],
+        "created_at": user["created_at"]
+    }
@@ -0,0 +1,62 @@
+"""
+Lookup/update cost of the indexed stores as they grow.
+
+Run from the backend directory:
+    python -m benchmarks.bench_store
+"""
+import random
+import time
+from datetime import datetime
+
+from app.services.store import IndexedStore
+
+SIZES = [1_000, 10_000, 100_000]
+OPS = 20_000
+
+
+def _fill(size: int):
+    store = IndexedStore(unique_fields=("email",))
+    scan = []
+    for i in range(size):
+        record = store.insert({
+            "email": f"user{i}@example.com",
+            "progress": 0.0,
+            "created_at": datetime.utcnow(),
+        })
+        scan.append(record)
+    return store, scan
+
+
+def _per_op_us(fn, keys) -> float:
+    start = time.perf_counter()
+    for key in keys:
+        fn(key)
+    return (time.perf_counter() - start) / len(keys) * 1e6
+
+
+def _scan_get(records, record_id):
+    # Baseline: the old list scan the services used to do
+    for record in records:
+        if record["id"] == record_id:
+            return record
+    return None
+
+
+def main():
+    print(f"{'size':>8} {'get':>10} {'get_by':>10} {'update':>10} {'list scan':>12}  (µs/op)")
+    for size in SIZES:
+        store, scan = _fill(size)
+        ids = [random.randint(1, size) for _ in range(OPS)]
+        emails = [f"user{i - 1}@example.com" for i in ids]
+
+        get_us = _per_op_us(store.get, ids)
+        get_by_us = _per_op_us(lambda e: store.get_by("email", e), emails)
+        update_us = _per_op_us(lambda i: store.update(i, progress=50.0), ids)
+        # The scan is O(n); sample fewer lookups so large sizes finish quickly
+        scan_us = _per_op_us(lambda i: _scan_get(scan, i), ids[:200])
+
+        print(f"{size:>8} {get_us:>10.3f} {get_by_us:>10.3f} {update_us:>10.3f} {scan_us:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
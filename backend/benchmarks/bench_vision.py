@@ -0,0 +1,202 @@
+"""
+Vision pipeline benchmark on synthetic cameras (no webcam needed).
+
+Runs N simulated printers, each a CameraService on a synthetic:// source,
+through the monitor's stages: capture (frame age when picked up),
+inference (shared batch worker), annotation and JPEG encoding. Reports
+latency percentiles per stage, end-to-end FPS, and writes JSON.
+
+Run from the backend directory:
+    python -m benchmarks.bench_vision --printers 4 --duration 20 --output vision.json
+    python -m benchmarks.bench_vision --baseline vision.json    # exit 1 on regression
+
+Inference is skipped (and reported as such) when MODEL_PATH doesn't exist.
+"""
+import argparse
+import json
+import platform
+import sys
+import threading
+import time
+from typing import Dict, List
+
+import cv2
+import numpy as np
+
+from app.core.config import settings
+from app.services.camera_service import CameraService
+
+STAGES = ["capture", "inference", "annotate", "encode", "end_to_end"]
+
+# Drawn when there is no model, so annotation is still measured
+_PLACEHOLDER_DETECTIONS = [
+    {"class_id": 1, "class_name": "failure_1", "confidence": 0.9, "bbox": [40, 40, 200, 160]},
+    {"class_id": 0, "class_name": "finished", "confidence": 0.7, "bbox": [220, 120, 400, 300]},
+]
+
+
+def _percentiles(samples: List[float]) -> dict:
+    if not samples:
+        return {"count": 0}
+    ms = np.asarray(samples) * 1000
+    return {
+        "count": int(len(ms)),
+        "mean_ms": round(float(ms.mean()), 3),
+        "p50_ms": round(float(np.percentile(ms, 50)), 3),
+        "p95_ms": round(float(np.percentile(ms, 95)), 3),
+        "p99_ms": round(float(np.percentile(ms, 99)), 3),
+        "max_ms": round(float(ms.max()), 3),
+    }
+
+
+def _run_printer(camera: CameraService, analyze, deadline: float, samples: Dict[str, List[float]], counts: list, index: int):
+    """One printer's monitor loop, timing every stage."""
+    quality = [cv2.IMWRITE_JPEG_QUALITY, settings.STREAM_JPEG_QUALITY]
+    last_seq = 0
+    while time.monotonic() < deadline:
+        seq, frame = camera.wait_for_raw_frame(last_seq, 1.0)
+        if frame is None:
+            continue
+        last_seq = seq
+        with camera.pinned_frame(seq) as frame:
+            if frame is None:
+                continue
+            start = time.perf_counter()
+            samples["capture"].append(max(0.0, time.time() - camera.ring.timestamp(seq)))
+
+            if analyze is not None:
+                t = time.perf_counter()
+                detections = analyze(frame)
+                samples["inference"].append(time.perf_counter() - t)
+            else:
+                detections = _PLACEHOLDER_DETECTIONS
+            camera.publish_detections(detections or _PLACEHOLDER_DETECTIONS)
+
+            t = time.perf_counter()
+            rendered = camera.render(frame)
+            samples["annotate"].append(time.perf_counter() - t)
+
+            t = time.perf_counter()
+            cv2.imencode(".jpg", rendered, quality)
+            samples["encode"].append(time.perf_counter() - t)
+
+            samples["end_to_end"].append(time.perf_counter() - start)
+        counts[index] += 1
+
+
+def run(printers: int, duration: float, width: int, height: int, fps: float, warmup: float) -> dict:
+    analyze = None
+    worker = None
+    if settings.model_exists():
+        from app.events.ai_monitor import analyze_frame, inference_worker, warmup_model
+        warmup_model()
+        analyze, worker = analyze_frame, inference_worker
+
+    cameras = [CameraService(f"synthetic://{width}x{height}@{fps:g}") for _ in range(printers)]
+    for camera in cameras:
+        if not camera.start_camera():
+            raise RuntimeError("Could not start synthetic camera")
+        if worker is not None:
+            worker.register()
+
+    samples: List[Dict[str, List[float]]] = [{stage: [] for stage in STAGES} for _ in cameras]
+    counts = [0] * printers
+    try:
+        # Warm-up pass, discarded
+        if warmup > 0:
+            scratch = [{stage: [] for stage in STAGES} for _ in cameras]
+            _run_all(cameras, analyze, warmup, scratch, [0] * printers)
+        _run_all(cameras, analyze, duration, samples, counts)
+    finally:
+        for camera in cameras:
+            camera.stop_camera()
+            if worker is not None:
+                worker.unregister()
+
+    merged = {stage: [s for per_printer in samples for s in per_printer[stage]] for stage in STAGES}
+    result = {
+        "config": {
+            "printers": printers,
+            "duration_s": duration,
+            "resolution": [width, height],
+            "source_fps": fps,
+            "jpeg_quality": settings.STREAM_JPEG_QUALITY,
+            "inference": "skipped (no model)" if analyze is None else settings.INFERENCE_BACKEND,
+            "batching": settings.INFERENCE_BATCHING,
+            "python": platform.python_version(),
+            "opencv": cv2.__version__,
+        },
+        "stages": {stage: _percentiles(merged[stage]) for stage in STAGES},
+        "fps": {
+            "total": round(sum(counts) / duration, 2),
+            "per_printer": [round(c / duration, 2) for c in counts],
+        },
+    }
+    if worker is not None:
+        result["batching"] = worker.stats()
+    return result
+
+
+def _run_all(cameras, analyze, duration, samples, counts):
+    deadline = time.monotonic() + duration
+    threads = [
+        threading.Thread(target=_run_printer, args=(camera, analyze, deadline, samples[i], counts, i), daemon=True)
+        for i, camera in enumerate(cameras)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def compare(result: dict, baseline: dict, tolerance: float) -> List[str]:
+    """Regressions of result against baseline: p95 latencies up or total FPS down by more than tolerance."""
+    regressions = []
+    for stage in STAGES:
+        new, old = result["stages"].get(stage, {}), baseline.get("stages", {}).get(stage, {})
+        if "p95_ms" in new and "p95_ms" in old and new["p95_ms"] > old["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{stage} p95 {old['p95_ms']:.2f} -> {new['p95_ms']:.2f} ms")
+    old_fps = baseline.get("fps", {}).get("total")
+    if old_fps and result["fps"]["total"] < old_fps * (1 - tolerance):
+        regressions.append(f"total fps {old_fps:.1f} -> {result['fps']['total']:.1f}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--printers", type=int, default=4)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--warmup", type=float, default=2.0)
+    parser.add_argument("--width", type=int, default=640)
+    parser.add_argument("--height", type=int, default=480)
+    parser.add_argument("--fps", type=float, default=30.0, help="frame rate of each synthetic camera")
+    parser.add_argument("--output", help="write the JSON result here")
+    parser.add_argument("--baseline", help="JSON result to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="allowed relative regression")
+    args = parser.parse_args()
+
+    result = run(args.printers, args.duration, args.width, args.height, args.fps, args.warmup)
+
+    print(f"{'stage':<12} {'count':>7} {'p50':>9} {'p95':>9} {'p99':>9} {'max':>9}  (ms)")
+    for stage, s in result["stages"].items():
+        if s["count"]:
+            print(f"{stage:<12} {s['count']:>7} {s['p50_ms']:>9.2f} {s['p95_ms']:>9.2f} {s['p99_ms']:>9.2f} {s['max_ms']:>9.2f}")
+        else:
+            print(f"{stage:<12} {'-':>7}")
+    print(f"end-to-end fps: {result['fps']['total']} total, {result['fps']['per_printer']} per printer")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(result, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION: {regression}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,283 @@
+"""
+In-process load generator for the HTTP API.
+
+Drives the FastAPI app through httpx's ASGI transport (no server, no
+network) with a number of concurrent virtual users running a scenario,
+and reports requests/s, latency percentiles and error rate per route.
+
+Run from the backend directory:
+    python -m benchmarks.loadtest --scenario farm --users 50 --duration 20 --output farm.json
+    python -m benchmarks.loadtest --scenario farm --baseline farm.json   # exit 1 on regression
+
+Scenarios:
+    auth       sign-ins (bcrypt) and /me (JWT) from many users
+    farm       printers creating jobs and reporting progress, single and bulk
+    dashboard  dashboards polling job/printer lists (with ETags) and /me
+    mixed      all of the above together
+
+No camera or model is needed: unless set in the environment, cameras are
+synthetic and model warm-up is off, so job creation runs as in production
+minus the hardware.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from typing import Dict, List, Tuple
+
+os.environ.setdefault("CAMERA_SOURCE", "synthetic://320x240@5")
+os.environ.setdefault("MODEL_WARMUP", "False")
+
+import httpx
+import numpy as np
+
+from app.main import app
+
+PASSWORD = "loadtest-password"
+
+
+class Stats:
+    """Latencies and failures per route."""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = {}
+        self.errors: Dict[str, int] = {}
+
+    def record(self, route: str, seconds: float, ok: bool):
+        self.latencies.setdefault(route, []).append(seconds)
+        if not ok:
+            self.errors[route] = self.errors.get(route, 0) + 1
+
+    def report(self, duration: float) -> dict:
+        routes = {}
+        for route, samples in sorted(self.latencies.items()):
+            ms = np.asarray(samples) * 1000
+            routes[route] = {
+                "requests": int(len(ms)),
+                "rps": round(len(ms) / duration, 2),
+                "p50_ms": round(float(np.percentile(ms, 50)), 3),
+                "p95_ms": round(float(np.percentile(ms, 95)), 3),
+                "p99_ms": round(float(np.percentile(ms, 99)), 3),
+                "max_ms": round(float(ms.max()), 3),
+                "error_rate": round(self.errors.get(route, 0) / len(ms), 4),
+            }
+        total = sum(r["requests"] for r in routes.values())
+        errors = sum(self.errors.values())
+        return {
+            "routes": routes,
+            "total": {
+                "requests": total,
+                "rps": round(total / duration, 2),
+                "error_rate": round(errors / total, 4) if total else 0.0,
+            },
+        }
+
+
+async def _call(client: httpx.AsyncClient, stats: Stats, route: str, method: str, url: str, ok=(200, 201, 304), **kwargs):
+    start = time.perf_counter()
+    try:
+        response = await client.request(method, url, **kwargs)
+    except Exception:
+        stats.record(route, time.perf_counter() - start, False)
+        return None
+    stats.record(route, time.perf_counter() - start, response.status_code in ok)
+    return response
+
+
+class Context:
+    """Data created during setup and shared by the virtual users."""
+
+    def __init__(self):
+        self.users: List[Tuple[str, str]] = []      # (email, token)
+        self.printers: List[int] = []
+        self.jobs: List[int] = []
+        self.progress: Dict[int, float] = {}
+
+
+def _expect(response: httpx.Response, status: int, what: str) -> dict:
+    # A failed setup step would make the run measure error responses instead
+    if response.status_code != status:
+        raise RuntimeError(f"Setup failed to {what}: HTTP {response.status_code} {response.text[:200]}")
+    return response.json()
+
+
+async def setup(client: httpx.AsyncClient, ctx: Context, users: int, printers: int):
+    for i in range(printers):
+        response = await client.post("/api/printers/register", json={"name": f"lt-printer-{i}", "location": "load"})
+        ctx.printers.append(_expect(response, 200, "register a printer")["id"])
+    for i in range(users):
+        email = f"lt-{os.getpid()}-{i}@example.com"
+        response = await client.post("/api/auth/signup", json={"email": email, "password": PASSWORD})
+        _expect(response, 201, f"sign up {email}")
+        response = await client.post("/api/auth/signin-json", json={"email": email, "password": PASSWORD})
+        ctx.users.append((email, _expect(response, 200, f"sign in {email}")["access_token"]))
+    for printer_id in ctx.printers:
+        response = await client.post("/api/jobs/create", json={"printer_id": printer_id, "file_name": "seed.gcode"})
+        ctx.jobs.append(_expect(response, 200, "create a job")["id"])
+
+
+# Actions: one request (or a short exchange) a virtual user performs
+
+async def signin(client, stats, ctx, user):
+    email, _ = ctx.users[user % len(ctx.users)]
+    await _call(client, stats, "POST /auth/signin-json", "POST", "/api/auth/signin-json",
+                json={"email": email, "password": PASSWORD})
+
+
+async def me(client, stats, ctx, user):
+    _, token = ctx.users[user % len(ctx.users)]
+    await _call(client, stats, "GET /auth/me", "GET", "/api/auth/me", headers={"Authorization": f"Bearer {token}"})
+
+
+async def create_job(client, stats, ctx, user):
+    response = await _call(client, stats, "POST /jobs/create", "POST", "/api/jobs/create",
+                           json={"printer_id": random.choice(ctx.printers), "file_name": "part.gcode"})
+    if response is not None and response.status_code == 200:
+        ctx.jobs.append(response.json()["id"])
+
+
+def _next_progress(ctx: Context, job_id: int) -> float:
+    progress = min(100.0, ctx.progress.get(job_id, 0.0) + random.uniform(0.5, 3.0))
+    ctx.progress[job_id] = progress
+    return round(progress, 2)
+
+
+async def report_progress(client, stats, ctx, user):
+    job_id = random.choice(ctx.jobs)
+    await _call(client, stats, "POST /jobs/{id}/progress", "POST", f"/api/jobs/{job_id}/progress",
+                params={"progress": _next_progress(ctx, job_id)})
+
+
+async def report_progress_bulk(client, stats, ctx, user):
+    jobs = random.sample(ctx.jobs, min(20, len(ctx.jobs)))
+    updates = [{"job_id": job_id, "progress": _next_progress(ctx, job_id)} for job_id in jobs]
+    await _call(client, stats, "POST /jobs/progress", "POST", "/api/jobs/progress", json={"updates": updates})
+
+
+_etags: Dict[Tuple[int, str], str] = {}
+
+
+async def _poll(client, stats, user, route, url):
+    # Dashboards keep the last ETag, as a browser would
+    etag = _etags.get((user, url))
+    headers = {"If-None-Match": etag} if etag else {}
+    response = await _call(client, stats, route, "GET", url, headers=headers)
+    if response is not None and "etag" in response.headers:
+        _etags[(user, url)] = response.headers["etag"]
+
+
+async def poll_jobs(client, stats, ctx, user):
+    await _poll(client, stats, user, "GET /jobs/list", "/api/jobs/list")
+
+
+async def poll_printers(client, stats, ctx, user):
+    await _poll(client, stats, user, "GET /printers/list", "/api/printers/list")
+
+
+async def get_job(client, stats, ctx, user):
+    await _call(client, stats, "GET /jobs/{id}", "GET", f"/api/jobs/{random.choice(ctx.jobs)}")
+
+
+# Scenario: weighted actions, and the pause between two actions of a user
+SCENARIOS: Dict[str, dict] = {
+    "auth": {"actions": [(signin, 1), (me, 9)], "think_s": 0.0},
+    "farm": {"actions": [(report_progress, 6), (report_progress_bulk, 2), (create_job, 1), (get_job, 1)], "think_s": 0.0},
+    "dashboard": {"actions": [(poll_jobs, 4), (poll_printers, 2), (me, 2), (get_job, 2)], "think_s": 0.0},
+    "mixed": {
+        "actions": [(signin, 1), (me, 10), (report_progress, 10), (report_progress_bulk, 3),
+                    (create_job, 2), (poll_jobs, 8), (poll_printers, 4), (get_job, 4)],
+        "think_s": 0.0,
+    },
+}
+
+
+async def _virtual_user(client, stats, ctx, user, scenario, deadline):
+    actions, weights = zip(*scenario["actions"])
+    while time.monotonic() < deadline:
+        action = random.choices(actions, weights)[0]
+        await action(client, stats, ctx, user)
+        if scenario["think_s"]:
+            await asyncio.sleep(scenario["think_s"])
+
+
+async def run(scenario_name: str, users: int, duration: float, printers: int, warmup: float) -> dict:
+    scenario = SCENARIOS[scenario_name]
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=60) as client:
+            ctx = Context()
+            await setup(client, ctx, users=min(users, 20), printers=printers)
+
+            if warmup > 0:
+                deadline = time.monotonic() + warmup
+                await asyncio.gather(*[_virtual_user(client, Stats(), ctx, u, scenario, deadline) for u in range(users)])
+
+            stats = Stats()
+            start = time.monotonic()
+            deadline = start + duration
+            await asyncio.gather(*[_virtual_user(client, stats, ctx, u, scenario, deadline) for u in range(users)])
+            elapsed = time.monotonic() - start
+
+    result = stats.report(elapsed)
+    result["config"] = {"scenario": scenario_name, "users": users, "duration_s": round(elapsed, 2), "printers": printers}
+    return result
+
+
+def compare(result: dict, baseline: dict, tolerance: float) -> List[str]:
+    """Regressions against a baseline: per-route p95 or error rate up, or throughput down."""
+    regressions = []
+    for route, new in result["routes"].items():
+        old = baseline.get("routes", {}).get(route)
+        if old is None:
+            continue
+        if new["p95_ms"] > old["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{route} p95 {old['p95_ms']:.2f} -> {new['p95_ms']:.2f} ms")
+        if new["error_rate"] > old["error_rate"] + 0.01:
+            regressions.append(f"{route} error rate {old['error_rate']:.2%} -> {new['error_rate']:.2%}")
+    old_rps = baseline.get("total", {}).get("rps")
+    if old_rps and result["total"]["rps"] < old_rps * (1 - tolerance):
+        regressions.append(f"total rps {old_rps:.1f} -> {result['total']['rps']:.1f}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenario", choices=sorted(SCENARIOS), default="mixed")
+    parser.add_argument("--users", type=int, default=20, help="concurrent virtual users")
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--warmup", type=float, default=2.0)
+    parser.add_argument("--printers", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write the JSON result here")
+    parser.add_argument("--baseline", help="JSON result to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed relative regression")
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    result = asyncio.run(run(args.scenario, args.users, args.duration, args.printers, args.warmup))
+
+    print(f"{'route':<26} {'reqs':>7} {'rps':>9} {'p50':>8} {'p95':>8} {'p99':>8} {'errors':>7}  (ms)")
+    for route, r in result["routes"].items():
+        print(f"{route:<26} {r['requests']:>7} {r['rps']:>9.1f} {r['p50_ms']:>8.2f} {r['p95_ms']:>8.2f} "
+              f"{r['p99_ms']:>8.2f} {r['error_rate']:>7.2%}")
+    total = result["total"]
+    print(f"total: {total['requests']} requests, {total['rps']} rps, {total['error_rate']:.2%} errors")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(result, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION: {regression}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,23 @@
+from app.services.camera_service import CameraService
+
+
+def test_stream_resumes_after_camera_restart():
+    camera = CameraService("synthetic://160x120@50")
+    broadcaster = camera.broadcaster
+    broadcaster.subscribe()
+    try:
+        assert camera.start_camera()
+        seq, jpeg = broadcaster.wait_next(0, timeout=2.0)
+        assert jpeg is not None
+        for _ in range(5):
+            seq, _ = broadcaster.wait_next(seq, timeout=2.0)
+        camera.stop_camera()
+
+        assert camera.start_camera()
+        assert camera.frame_seq > seq
+        new_seq, new_jpeg = broadcaster.wait_next(seq, timeout=2.0)
+        assert new_jpeg is not None and new_seq > seq
+        assert broadcaster.snapshot() is not None
+    finally:
+        broadcaster.unsubscribe()
+        camera.stop_camera()
@@ -0,0 +1,19 @@
+from fastapi.testclient import TestClient
+
+from app.main import app
+
+client = TestClient(app)
+
+
+def test_list_accepts_timezone_aware_filters():
+    printer = client.post("/api/printers/register", json={"name": "tz", "location": "lab"}).json()
+    job = client.post("/api/jobs/create", json={"printer_id": printer["id"], "file_name": "tz.gcode"}).json()
+
+    for created_after in ("2020-01-01T00:00:00Z", "2020-01-01T02:00:00+02:00"):
+        response = client.get("/api/jobs/list", params={"created_after": created_after, "printer_id": printer["id"]})
+        assert response.status_code == 200
+        assert [j["id"] for j in response.json()] == [job["id"]]
+
+    response = client.get("/api/jobs/list", params={"created_before": "2020-01-01T00:00:00-05:00", "printer_id": printer["id"]})
+    assert response.status_code == 200
+    assert response.json() == []